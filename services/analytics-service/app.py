@@ -22,7 +22,7 @@ class AnalyticsCollector:
     def __init__(self, redis_url: str = "redis://redis:6379"):
         self.redis_url = redis_url
         self.redis: Optional[redis.Redis] = None
-        self.message_bus = MessageBus(redis_url)
+        self.message_bus = MessageBus(redis_url, group="analytics-service")
         self.metrics = {
             "total_downloads": 0,
             "successful_downloads": 0,
@@ -27,7 +27,7 @@ class DownloadWorker:
     def __init__(self, redis_url: str = "redis://redis:6379", worker_id: str = None):
         self.redis_url = redis_url
         self.worker_id = worker_id or f"worker_{os.getpid()}"
-        self.message_bus = MessageBus(redis_url)
+        self.message_bus = MessageBus(redis_url, group="download-worker")
         self.active_downloads: Dict[str, DownloadTask] = {}
         self.resume_data: Dict[str, ResumeData] = {}
         self._shutdown = False
@@ -200,13 +200,13 @@ class DownloadWorker:
                         progress_data.update(d)
 
                         # Publish progress
-                        asyncio.create_task(self.message_bus.publish(
+                        self.message_bus.publish_nowait(
                             create_download_message(task.id, MessageType.DOWNLOAD_PROGRESS, {
                                 "progress": progress,
                                 "speed": d.get("speed"),
                                 "eta": d.get("eta")
                             })
-                        ))
+                        )
 
             ydl_opts['progress_hooks'] = [progress_hook]
 
@@ -272,13 +272,13 @@ class DownloadWorker:
                         progress = (downloaded / total) * 100
                         task.progress = progress
 
-                        asyncio.create_task(self.message_bus.publish(
+                        self.message_bus.publish_nowait(
                             create_download_message(task.id, MessageType.DOWNLOAD_PROGRESS, {
                                 "progress": progress,
                                 "speed": d.get("speed"),
                                 "eta": d.get("eta")
                             })
-                        ))
+                        )
 
             ydl_opts['progress_hooks'] = [progress_hook]
 
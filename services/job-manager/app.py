@@ -27,7 +27,7 @@ class JobManager:
     def __init__(self, redis_url: str = "redis://redis:6379"):
         self.redis_url = redis_url
         self.redis: Optional[redis.Redis] = None
-        self.message_bus = MessageBus(redis_url)
+        self.message_bus = MessageBus(redis_url, group="job-manager")
         self.active_jobs: Dict[str, DownloadJob] = {}
         self._shutdown = False
 
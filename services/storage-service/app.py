@@ -24,7 +24,7 @@ class StorageManager:
     def __init__(self, storage_path: str = "/app/storage"):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.message_bus = MessageBus()
+        self.message_bus = MessageBus(group="storage-service")
         self._init_cleanup_dirs()
 
     def _init_cleanup_dirs(self):
@@ -1,51 +1,155 @@
 """Message queue utilities for inter-service communication"""
 
 import json
+import os
 import asyncio
+from dataclasses import asdict
+from enum import Enum
+from pathlib import Path
 from typing import Callable, Dict, Any, Optional, List
 from datetime import datetime
 import redis.asyncio as redis
+from redis.exceptions import ResponseError
 from .models import ServiceMessage, MessageType
 
-class MessageQueue:
-    """Redis-based message queue for inter-service communication"""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard as zstd
+    _zc = zstd.ZstdCompressor(level=3)
+    _zd = zstd.ZstdDecompressor()
+except ImportError:
+    zstd = None
+
+# Compressed messages carry a leading flag byte; plain JSON goes out untagged so
+# consumers that predate compression can still read it. JSON never starts with \x01
+_ZSTD = b'\x01'
+# Flag byte that briefly preceded uncompressed messages too; still accepted when decoding
+_RAW = b'\x00'
+COMPRESSION_THRESHOLD = 512
+
+def _json_default(obj: Any) -> Any:
+    """Serialize the non-JSON types that can appear in a ServiceMessage"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(message: ServiceMessage) -> bytes:
+    """Serialize a ServiceMessage dataclass straight to JSON bytes"""
+    if orjson is not None:
+        # Non-str keys (e.g. int-keyed payload dicts) are stringified, as json.dumps does
+        return orjson.dumps(message, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(asdict(message), default=_json_default).encode('utf-8')
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Direct value -> member lookup, bypassing the Enum metaclass on every message
+_MT_FROM_VALUE: Dict[str, MessageType] = {mt.value: mt for mt in MessageType}
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
+class MessageQueue:
+    """Redis Streams message queue for inter-service communication
+
+    Each message type is a stream. Every consumer group (one per service) sees
+    every message, and entries are acknowledged only once handled, so delivery
+    is at-least-once even while a consumer is down.
+    """
+
+    STREAM_MAXLEN = 100000
+    STREAM_BATCH_SIZE = 64
+    STREAM_BLOCK_MS = 1000
+    PENDING_RETRY_INTERVAL = 30.0
+    CONSUMER_MIN_BACKOFF = 1.0
+    CONSUMER_MAX_BACKOFF = 30.0
+    MAX_CONNECTIONS = 32
+
+    def __init__(self, redis_url: str = "redis://localhost:6379", group: str = "default",
+                 consumer: Optional[str] = None):
         self.redis_url = redis_url
         self.redis: Optional[redis.Redis] = None
+        self._pool: Optional[redis.ConnectionPool] = None
         self.subscribers: Dict[MessageType, List[Callable]] = {}
         self._running = False
 
+        self.group = group
+        self.consumer = consumer or f"{group}_{os.getpid()}"
+
     async def connect(self) -> None:
         """Connect to Redis"""
-        self.redis = redis.from_url(self.redis_url)
+        # Raw bytes responses: payloads are decoded by _deserialize_message, never by redis-py
+        self._pool = redis.ConnectionPool.from_url(
+            self.redis_url, decode_responses=False, max_connections=self.MAX_CONNECTIONS
+        )
+        self.redis = redis.Redis(connection_pool=self._pool)
         await self.redis.ping()
 
     async def disconnect(self) -> None:
         """Disconnect from Redis"""
         if self.redis:
             await self.redis.close()
+        if self._pool:
+            await self._pool.disconnect()
+            self._pool = None
 
     async def publish(self, message: ServiceMessage) -> None:
-        """Publish a message to the queue"""
+        """Publish a message to its Redis stream with a single XADD"""
         if not self.redis:
             await self.connect()
 
-        channel = f"service:{message.message_type.value}"
-        message_data = {
-            "message_id": message.message_id,
-            "message_type": message.message_type.value,
-            "service": message.service,
-            "timestamp": message.timestamp.isoformat(),
-            "correlation_id": message.correlation_id,
-            "payload": message.payload
-        }
+        stream_key = f"stream:{message.message_type.value}"
+        await self.redis.xadd(
+            stream_key, {"data": self._serialize_message(message)},
+            maxlen=self.STREAM_MAXLEN, approximate=True
+        )
 
-        await self.redis.publish(channel, json.dumps(message_data))
+    async def publish_many(self, messages: List[ServiceMessage]) -> None:
+        """Publish a batch of messages in a single pipelined round-trip"""
+        if not self.redis:
+            await self.connect()
 
-        # Also store in a persistent queue for reliability
-        queue_key = f"queue:{message.message_type.value}"
-        await self.redis.lpush(queue_key, json.dumps(message_data))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.xadd(
+                    f"stream:{message.message_type.value}", {"data": self._serialize_message(message)},
+                    maxlen=self.STREAM_MAXLEN, approximate=True
+                )
+            await pipe.execute()
+
+    @staticmethod
+    def _serialize_message(message: ServiceMessage) -> bytes:
+        """Serialize a message to its wire format, zstd-compressing large bodies"""
+        data = _dumps(message)
+
+        if zstd is not None and len(data) > COMPRESSION_THRESHOLD:
+            return _ZSTD + _zc.compress(data)
+        return data
+
+    @staticmethod
+    def _deserialize_message(raw: bytes) -> ServiceMessage:
+        """Parse a message from its wire format"""
+        flag, body = raw[:1], raw
+        if flag == _ZSTD:
+            if zstd is None:
+                raise RuntimeError("Received zstd-compressed message but zstandard is not installed")
+            body = _zd.decompress(raw[1:])
+        elif flag == _RAW:
+            body = raw[1:]
+
+        data = _loads(body)
+        return ServiceMessage(
+            message_id=data['message_id'],
+            message_type=_MT_FROM_VALUE[data['message_type']],
+            service=data['service'],
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            correlation_id=data.get('correlation_id'),
+            payload=data.get('payload', {})
+        )
 
     async def subscribe(self, message_type: MessageType, callback: Callable[[ServiceMessage], None]) -> None:
         """Subscribe to a message type"""
@@ -63,7 +167,7 @@ class MessageQueue:
         # Start consumers for each subscribed message type
         tasks = []
         for message_type in self.subscribers:
-            task = asyncio.create_task(self._consume_messages(message_type))
+            task = asyncio.create_task(self._consume_stream(message_type))
             tasks.append(task)
 
         await asyncio.gather(*tasks, return_exceptions=True)
@@ -72,111 +176,120 @@ class MessageQueue:
         """Stop consuming messages"""
         self._running = False
 
-    async def _consume_messages(self, message_type: MessageType) -> None:
-        """Consume messages for a specific type"""
+    async def _consume_stream(self, message_type: MessageType) -> None:
+        """Consume messages for a specific type from its Redis stream
+
+        An entry is acknowledged only once it was decoded and every subscriber
+        handled it; failed entries stay pending and are re-read from the start
+        of the pending list every PENDING_RETRY_INTERVAL seconds.
+        """
         if not self.redis:
             return
 
-        pubsub = self.redis.pubsub()
-        await pubsub.subscribe(f"service:{message_type.value}")
+        stream_key = f"stream:{message_type.value}"
+        loop = asyncio.get_running_loop()
+        group_ready = False
+        backoff = self.CONSUMER_MIN_BACKOFF
 
-        try:
-            while self._running:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message:
-                    try:
-                        data = json.loads(message['data'])
-                        service_message = ServiceMessage(
-                            message_id=data['message_id'],
-                            message_type=MessageType(data['message_type']),
-                            service=data['service'],
-                            timestamp=datetime.fromisoformat(data['timestamp']),
-                            correlation_id=data.get('correlation_id'),
-                            payload=data.get('payload', {})
-                        )
-
-                        # Call all subscribers
-                        for callback in self.subscribers[message_type]:
-                            try:
-                                await callback(service_message)
-                            except Exception as e:
-                                print(f"Error in message callback: {e}")
-
-                    except Exception as e:
-                        print(f"Error processing message: {e}")
-
-        except Exception as e:
-            print(f"Error in message consumer: {e}")
-        finally:
-            await pubsub.unsubscribe(f"service:{message_type.value}")
+        # Re-deliver our own unacknowledged entries first, then switch to new ones
+        last_id = "0"
+        retry_at: Optional[float] = None
 
-    async def get_pending_messages(self, message_type: MessageType, limit: int = 10) -> List[ServiceMessage]:
-        """Get pending messages from persistent queue"""
-        if not self.redis:
-            await self.connect()
-
-        queue_key = f"queue:{message_type.value}"
-        messages = []
+        while self._running:
+            try:
+                if not group_ready:
+                    await self._ensure_stream_group(stream_key)
+                    group_ready = True
 
-        for _ in range(limit):
-            message_data = await self.redis.rpop(queue_key)
-            if not message_data:
-                break
+                if last_id == ">" and retry_at is not None and loop.time() >= retry_at:
+                    last_id, retry_at = "0", None
 
-            try:
-                data = json.loads(message_data)
-                message = ServiceMessage(
-                    message_id=data['message_id'],
-                    message_type=MessageType(data['message_type']),
-                    service=data['service'],
-                    timestamp=datetime.fromisoformat(data['timestamp']),
-                    correlation_id=data.get('correlation_id'),
-                    payload=data.get('payload', {})
+                response = await self.redis.xreadgroup(
+                    self.group, self.consumer, {stream_key: last_id},
+                    count=self.STREAM_BATCH_SIZE, block=self.STREAM_BLOCK_MS
                 )
-                messages.append(message)
+                entries = response[0][1] if response else []
+                backoff = self.CONSUMER_MIN_BACKOFF
+                if not entries:
+                    # The pending list is exhausted (or nothing new arrived)
+                    last_id = ">"
+                    continue
+
+                handled = [
+                    entry_id for entry_id, fields in entries
+                    if await self._dispatch_stream_entry(message_type, fields)
+                ]
+                if handled:
+                    await self.redis.xack(stream_key, self.group, *handled)
+                if len(handled) < len(entries) and retry_at is None:
+                    retry_at = loop.time() + self.PENDING_RETRY_INTERVAL
+
+                # Page through the pending list instead of re-reading its head
+                if last_id != ">":
+                    last_id = entries[-1][0]
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                print(f"Error parsing queued message: {e}")
-
-        return messages
-
-    async def queue_message(self, message: ServiceMessage) -> None:
-        """Add message to persistent queue"""
-        if not self.redis:
-            await self.connect()
-
-        queue_key = f"queue:{message.message_type.value}"
-        message_data = {
-            "message_id": message.message_id,
-            "message_type": message.message_type.value,
-            "service": message.service,
-            "timestamp": message.timestamp.isoformat(),
-            "correlation_id": message.correlation_id,
-            "payload": message.payload
-        }
-
-        await self.redis.lpush(queue_key, json.dumps(message_data))
+                # Transient Redis failures (including a deleted stream/group) shouldn't end the consumer
+                print(f"Error in stream consumer: {e}; retrying in {backoff:.0f}s")
+                group_ready = False
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.CONSUMER_MAX_BACKOFF)
+
+    async def _ensure_stream_group(self, stream_key: str) -> None:
+        """Create this queue's consumer group on the stream if it doesn't exist yet"""
+        try:
+            await self.redis.xgroup_create(stream_key, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
 
-    async def get_queue_length(self, message_type: MessageType) -> int:
-        """Get the length of a message queue"""
-        if not self.redis:
-            await self.connect()
+    async def _dispatch_stream_entry(self, message_type: MessageType, fields: Dict[bytes, bytes]) -> bool:
+        """Deliver one stream entry to all subscribers; True if it can be acknowledged"""
+        try:
+            service_message = self._deserialize_message(fields[b'data'])
+        except Exception as e:
+            print(f"Error processing message: {e}")
+            return False
 
-        queue_key = f"queue:{message_type.value}"
-        return await self.redis.llen(queue_key)
+        ok = True
+        for callback in self.subscribers[message_type]:
+            try:
+                await callback(service_message)
+            except Exception as e:
+                print(f"Error in message callback: {e}")
+                ok = False
+        return ok
 
 class MessageBus:
     """Central message bus for service communication"""
 
-    def __init__(self, redis_url: str = "redis://localhost:6379"):
-        self.queue = MessageQueue(redis_url)
+    FLUSH_INTERVAL = 0.002
+    FLUSH_BATCH_SIZE = 256
+
+    def __init__(self, redis_url: str = "redis://localhost:6379", group: str = "default"):
+        self.queue = MessageQueue(redis_url, group=group)
         self.handlers: Dict[str, Callable] = {}
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._flusher: Optional[asyncio.Task] = None
 
     async def start(self) -> None:
         """Start the message bus"""
         await self.queue.connect()
+        self._flusher = asyncio.create_task(self._flush_loop())
 
     async def stop(self) -> None:
         """Stop the message bus"""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+            # Deliver anything still buffered by publish_nowait
+            await self._flush()
         await self.queue.stop_consuming()
         await self.queue.disconnect()
 
@@ -184,6 +297,31 @@ class MessageBus:
         """Publish a message"""
         await self.queue.publish(message)
 
+    def publish_nowait(self, message: ServiceMessage) -> None:
+        """Buffer a message for the background flusher without awaiting Redis"""
+        self._outbox.put_nowait(message)
+
+    async def _flush_loop(self) -> None:
+        """Periodically drain buffered messages into pipelined batches"""
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        """Publish buffered messages, FLUSH_BATCH_SIZE per round-trip"""
+        while not self._outbox.empty():
+            batch = []
+            try:
+                while len(batch) < self.FLUSH_BATCH_SIZE:
+                    batch.append(self._outbox.get_nowait())
+            except asyncio.QueueEmpty:
+                pass
+
+            try:
+                await self.queue.publish_many(batch)
+            except Exception as e:
+                print(f"Error flushing {len(batch)} messages: {e}")
+
     async def subscribe(self, message_type: MessageType, handler: Callable[[ServiceMessage], None]) -> None:
         """Subscribe to a message type"""
         await self.queue.subscribe(message_type, handler)
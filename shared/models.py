@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
+from functools import partial
 from pathlib import Path
 
 class JobStatus(str, Enum):
@@ -126,23 +127,26 @@ class ResumeData:
     yt_dlp_state: Optional[Dict[str, Any]] = None
 
 # Message factory functions
-def create_job_message(job_id: str, message_type: MessageType, payload: Dict[str, Any]) -> ServiceMessage:
-    """Create a job-related message"""
+def _make_message(service: str, id_key: str, message_type: MessageType, type_value: str,
+                  entity_id: str, payload: Dict[str, Any]) -> ServiceMessage:
+    """Build a message; service and type value are bound ahead of time by the factory tables"""
     return ServiceMessage(
-        message_id=f"{job_id}_{message_type.value}_{datetime.now().isoformat()}",
+        message_id=f"{entity_id}_{type_value}_{datetime.now().isoformat()}",
         message_type=message_type,
-        service="job-manager",
-        payload={"job_id": job_id, **payload}
+        service=service,
+        payload={id_key: entity_id, **payload}
     )
 
+_job_factories = {mt: partial(_make_message, "job-manager", "job_id", mt, mt.value) for mt in MessageType}
+_download_factories = {mt: partial(_make_message, "download-worker", "task_id", mt, mt.value) for mt in MessageType}
+
+def create_job_message(job_id: str, message_type: MessageType, payload: Dict[str, Any]) -> ServiceMessage:
+    """Create a job-related message"""
+    return _job_factories[message_type](job_id, payload)
+
 def create_download_message(task_id: str, message_type: MessageType, payload: Dict[str, Any]) -> ServiceMessage:
     """Create a download-related message"""
-    return ServiceMessage(
-        message_id=f"{task_id}_{message_type.value}_{datetime.now().isoformat()}",
-        message_type=message_type,
-        service="download-worker",
-        payload={"task_id": task_id, **payload}
-    )
+    return _download_factories[message_type](task_id, payload)
 
 def create_storage_message(operation: str, payload: Dict[str, Any]) -> ServiceMessage:
     """Create a storage-related message"""
@@ -160,4 +164,4 @@ def create_analytics_message(event_type: str, data: Dict[str, Any]) -> ServiceMe
         message_type=MessageType.ANALYTICS_UPDATE,
         service="analytics-service",
         payload={"event_type": event_type, "data": data}
-    )
\ No newline at end of file
+    )
@@ -3,9 +3,15 @@
 import pytest
 import tempfile
 import os
+import shutil
+import sys
+import uuid
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+# core/ and utils/ import their siblings as top-level packages, as the CLI and API set up
+sys.path.insert(0, str(Path(__file__).parent.parent / 'youtube_downloader'))
+
 from youtube_downloader.config.config_manager import ConfigManager
 from youtube_downloader.models.database import DatabaseManager
 from youtube_downloader.models.data_models import DownloadConfig
@@ -24,16 +30,32 @@ def mock_config(temp_dir):
     config.config['max_workers'] = 1  # Reduce for testing
     return config
 
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory):
+    """Build the database schema once per session (per xdist worker)"""
+    db_path = tmp_path_factory.mktemp('template') / 'template.db'
+    DatabaseManager(str(db_path)).close()
+    return db_path
+
 @pytest.fixture
-def test_db(temp_dir):
-    """Create a test database"""
+def test_db(temp_dir, template_db):
+    """Create a test database from the pristine session template"""
     db_path = temp_dir / 'test.db'
+    shutil.copyfile(template_db, db_path)
     db = DatabaseManager(str(db_path))
     yield db
     # Cleanup
+    db.close()
     if db_path.exists():
         db_path.unlink()
 
+@pytest.fixture
+def test_db_memory():
+    """Create an in-memory test database (no disk I/O)"""
+    db = DatabaseManager(f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared")
+    yield db
+    db.close()
+
 @pytest.fixture
 def sample_download_config(temp_dir):
     """Create a sample download configuration"""
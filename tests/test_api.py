@@ -0,0 +1,120 @@
+"""Test the REST API's job lifecycle and progress streaming"""
+
+import asyncio
+import importlib
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from youtube_downloader.models.data_models import DownloadConfig, DownloadJob
+from youtube_downloader.models.database import AsyncDatabaseManager, DatabaseManager
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """Import the API module with its module-level database and config kept out of the repo"""
+    workdir = tmp_path_factory.mktemp('api')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return importlib.import_module('youtube_downloader.api.app')
+    finally:
+        os.chdir(cwd)
+
+@pytest.fixture
+def client(api, temp_dir, monkeypatch):
+    """TestClient backed by a throwaway database"""
+    db = DatabaseManager(str(temp_dir / 'api.db'))
+    monkeypatch.setattr(api, 'db', db)
+    monkeypatch.setattr(api, 'async_db', AsyncDatabaseManager(db))
+    with TestClient(api.app) as client:
+        yield client
+    db.close()
+
+class FakeDownloader:
+    """Downloader that reports progress once released by the test, then succeeds"""
+
+    release = threading.Event()
+
+    def __init__(self, config):
+        self.config = config
+
+    async def download_multiple_urls_async(self, urls, audio_only, executor=None):
+        def download():
+            if not self.release.wait(timeout=10):
+                raise TimeoutError("test never released the download")
+            for url in urls:
+                self.progress_hook({'status': 'downloading', 'filename': '/tmp/video.mp4',
+                                    'downloaded_bytes': 512, 'total_bytes': 1024})
+            return [{'success': True, 'url': url, 'title': 'Test Video'} for url in urls]
+        return await asyncio.get_running_loop().run_in_executor(executor, download)
+
+class TestProgressWebSocket:
+    def test_streams_running_job(self, api, client, temp_dir, monkeypatch):
+        """Test a client connected to a running job gets its progress and final status"""
+        downloader = type('Downloader', (FakeDownloader,), {'release': threading.Event()})
+        monkeypatch.setattr(api, 'YouTubeDownloader', downloader)
+
+        # TestClient runs background tasks before returning the response, so start the
+        # job on the app's event loop directly to keep it running while we connect
+        job = DownloadJob(id='job-ws', urls=['https://youtu.be/abc'],
+                          config=DownloadConfig(output_path=temp_dir / 'downloads'))
+        client.portal.call(api.job_registry.register, job)
+        client.portal.start_task_soon(api.process_download_job, job.id)
+
+        with client.websocket_connect(f'/downloads/{job.id}/ws') as ws:
+            assert ws.receive_json()['status'] in ('pending', 'running')
+            downloader.release.set()
+
+            events = []
+            while not events or events[-1].get('status') not in ('completed', 'failed'):
+                events.append(ws.receive_json())
+
+        assert events[-1] == {'type': 'status', 'job_id': job.id, 'status': 'completed', 'error': None}
+        progress = [e for e in events if e['type'] == 'progress']
+        assert progress == [{'type': 'progress', 'status': 'downloading', 'filename': 'video.mp4',
+                             'downloaded_bytes': 512, 'total_bytes': 1024, 'speed': None, 'eta': None}]
+
+    def test_finished_job_reports_stored_status(self, api, client, temp_dir, monkeypatch):
+        """Test a job that already finished gets its last stored status"""
+        downloader = type('Downloader', (FakeDownloader,), {'release': threading.Event()})
+        downloader.release.set()
+        monkeypatch.setattr(api, 'YouTubeDownloader', downloader)
+
+        job_id = client.post('/downloads', json={
+            'urls': ['https://youtu.be/abc'], 'output_path': str(temp_dir / 'downloads')
+        }).json()['job_id']
+        # Status transitions reach the database through the write-behind queue
+        client.portal.call(api._flush_job_writes)
+
+        with client.websocket_connect(f'/downloads/{job_id}/ws') as ws:
+            assert ws.receive_json()['status'] == 'completed'
+
+    def test_unknown_job(self, client):
+        """Test an unknown job id closes the stream with 4404"""
+        with client.websocket_connect('/downloads/missing/ws') as ws:
+            message = ws.receive()
+        assert message['type'] == 'websocket.close' and message['code'] == 4404
+
+class TestProgressHook:
+    def test_closed_loop_is_ignored(self, api):
+        """Test progress reported after the event loop closed does not raise into yt-dlp"""
+        loop = asyncio.new_event_loop()
+        hook = api._progress_hook(loop, 'job-1')
+        loop.close()
+
+        hook({'status': 'downloading'})
+
+    async def test_forwards_to_loop(self, api):
+        """Test progress from a download thread reaches the job's subscribers"""
+        queue = asyncio.Queue()
+        api.progress_subscribers['job-1'] = {queue}
+        try:
+            hook = api._progress_hook(asyncio.get_running_loop(), 'job-1')
+            await asyncio.to_thread(hook, {'status': 'finished', 'filename': 'a/b.mp4'})
+            event = await asyncio.wait_for(queue.get(), timeout=5)
+        finally:
+            del api.progress_subscribers['job-1']
+
+        assert event['status'] == 'finished' and event['filename'] == 'b.mp4'
@@ -7,10 +7,12 @@ from pathlib import Path
 from youtube_downloader.config.config_manager import ConfigManager
 
 class TestConfigManager:
-    def test_initialization(self, temp_dir):
+    def test_initialization(self, temp_dir, monkeypatch):
         """Test config manager initialization"""
+        # Keep a download_config.json in the working directory from overriding the defaults
+        monkeypatch.chdir(temp_dir)
         config = ConfigManager()
-        assert config.get('output_path') == './downloads'
+        assert Path(config.get('output_path')) == Path('./downloads')
         assert config.get('max_workers') == 3
 
     def test_environment_variables(self, temp_dir, monkeypatch):
@@ -18,6 +20,7 @@ class TestConfigManager:
         monkeypatch.setenv('YTD_OUTPUT_PATH', str(temp_dir / 'custom_downloads'))
         monkeypatch.setenv('YTD_MAX_WORKERS', '5')
         monkeypatch.setenv('YTD_AUDIO_ONLY', 'true')
+        monkeypatch.chdir(temp_dir)
 
         config = ConfigManager()
         assert config.get('output_path') == str(temp_dir / 'custom_downloads')
@@ -57,4 +60,17 @@ class TestConfigManager:
         assert config.get('max_workers') == 99
 
         config.reset_to_defaults()
-        assert config.get('max_workers') == original_workers
\ No newline at end of file
+        assert config.get('max_workers') == original_workers
+
+    def test_clone_with(self):
+        """Test cloning configuration with overrides"""
+        config = ConfigManager()
+        clone = config.clone_with({'max_workers': 7, 'audio_only': True})
+
+        assert clone.get('max_workers') == 7
+        assert clone.get('audio_only') is True
+        assert clone.get('format_preference') == config.get('format_preference')
+        assert config.get('max_workers') != 7
+
+        clone.update_ydl_opts({'retries': 1})
+        assert config.get_modern_ydl_opts()['retries'] != 1
@@ -1,6 +1,7 @@
 """Test database operations"""
 
 import pytest
+import threading
 from datetime import datetime, timedelta
 
 from youtube_downloader.models.database import DatabaseManager
@@ -11,7 +12,7 @@ class TestDatabaseManager:
         """Test database initialization"""
         assert test_db.db_path.exists()
 
-    def test_save_and_get_download_job(self, test_db, sample_download_config):
+    def test_save_and_get_download_job(self, test_db_memory, sample_download_config):
         """Test saving and retrieving download jobs"""
         job = DownloadJob(
             id="test-job-123",
@@ -21,16 +22,16 @@ class TestDatabaseManager:
         )
 
         # Save job
-        test_db.save_download_job(job)
+        test_db_memory.save_download_job(job)
 
         # Retrieve job
-        retrieved = test_db.get_download_job("test-job-123")
+        retrieved = test_db_memory.get_download_job("test-job-123")
         assert retrieved is not None
         assert retrieved.id == "test-job-123"
         assert len(retrieved.urls) == 2
         assert retrieved.status == "pending"
 
-    def test_save_and_get_download_results(self, test_db):
+    def test_save_and_get_download_results(self, test_db_memory):
         """Test saving and retrieving download results"""
         job_id = "test-job-results"
 
@@ -51,10 +52,10 @@ class TestDatabaseManager:
 
         # Save results
         for result in results:
-            test_db.save_download_result(job_id, result)
+            test_db_memory.save_download_result(job_id, result)
 
         # Retrieve results
-        retrieved = test_db.get_download_results(job_id)
+        retrieved = test_db_memory.get_download_results(job_id)
         assert len(retrieved) == 2
 
         successful = [r for r in retrieved if r.success]
@@ -65,10 +66,10 @@ class TestDatabaseManager:
         assert successful[0].title == "Test Video 1"
         assert failed[0].error == "Download failed"
 
-    def test_metrics_update(self, test_db):
+    def test_metrics_update(self, test_db_memory):
         """Test metrics calculation and updates"""
         # Initial metrics
-        initial = test_db.get_metrics()
+        initial = test_db_memory.get_metrics()
         assert initial.total_downloads == 0
 
         # Add some results
@@ -78,17 +79,31 @@ class TestDatabaseManager:
             DownloadResult(success=False, url="url3")
         ]
 
-        test_db.update_metrics(results)
+        test_db_memory.update_metrics(results)
 
         # Check updated metrics
-        updated = test_db.get_metrics()
+        updated = test_db_memory.get_metrics()
         assert updated.total_downloads == 3
         assert updated.successful_downloads == 2
         assert updated.failed_downloads == 1
         assert updated.total_bytes_downloaded == 3000
         assert updated.average_download_time == 12.5  # (10+15)/2
 
-    def test_cleanup_old_jobs(self, test_db, sample_download_config):
+    def test_metrics_cache_sees_other_threads_writes(self, test_db):
+        """Test cached metrics are refreshed after a write from another connection"""
+        assert test_db.get_metrics().total_downloads == 0
+        assert test_db.get_metrics() is test_db.get_metrics()
+
+        writer = threading.Thread(
+            target=test_db.update_metrics,
+            args=([DownloadResult(success=True, url="url1", file_size=1000, download_time=10.0)],)
+        )
+        writer.start()
+        writer.join()
+
+        assert test_db.get_metrics().total_downloads == 1
+
+    def test_cleanup_old_jobs(self, test_db_memory, sample_download_config):
         """Test cleanup of old jobs"""
         # Create jobs with different dates
         old_date = datetime.now() - timedelta(days=40)
@@ -112,14 +127,69 @@ class TestDatabaseManager:
             created_at=recent_date
         )
 
-        test_db.save_download_job(old_job)
-        test_db.save_download_job(recent_job)
+        test_db_memory.save_download_job(old_job)
+        test_db_memory.save_download_job(recent_job)
 
         # Cleanup jobs older than 30 days
-        deleted_count = test_db.cleanup_old_jobs(30)
+        deleted_count = test_db_memory.cleanup_old_jobs(30)
         assert deleted_count == 1
 
         # Check that old job is gone
-        assert test_db.get_download_job("old-job") is None
+        assert test_db_memory.get_download_job("old-job") is None
         # Check that recent job still exists
-        assert test_db.get_download_job("recent-job") is not None
\ No newline at end of file
+        assert test_db_memory.get_download_job("recent-job") is not None
+
+    def test_list_download_jobs(self, test_db_memory, sample_download_config):
+        """Test listing jobs with status filter, pagination and attached results"""
+        for i, status in enumerate(["completed", "failed", "completed"]):
+            test_db_memory.save_download_job(DownloadJob(
+                id=f"job-{i}",
+                urls=[f"https://youtu.be/test{i}"],
+                config=sample_download_config,
+                status=status,
+                created_at=datetime.now() - timedelta(minutes=10 - i)
+            ))
+        test_db_memory.save_download_result("job-2", DownloadResult(success=True, url="https://youtu.be/test2"))
+
+        jobs = test_db_memory.list_download_jobs()
+        assert [job.id for job in jobs] == ["job-2", "job-1", "job-0"]
+        assert len(jobs[0].results) == 1
+        assert jobs[1].results == []
+
+        completed = test_db_memory.list_download_jobs(status="completed", limit=1, offset=1)
+        assert [job.id for job in completed] == ["job-0"]
+
+    def test_get_download_job_with_results(self, test_db_memory, sample_download_config):
+        """Test loading a job and its results in a single query"""
+        sample_download_job = DownloadJob(
+            id="joined-job",
+            urls=["https://youtu.be/test"],
+            config=sample_download_config
+        )
+        test_db_memory.save_download_job(sample_download_job)
+        assert test_db_memory.get_download_job_with_results(sample_download_job.id).results == []
+
+        test_db_memory.save_download_result(sample_download_job.id, DownloadResult(
+            success=False, url="https://youtu.be/test", error="Download failed"
+        ))
+
+        job = test_db_memory.get_download_job_with_results(sample_download_job.id)
+        assert job.id == sample_download_job.id
+        assert job.error is None
+        assert [result.error for result in job.results] == ["Download failed"]
+        assert test_db_memory.get_download_job_with_results("missing") is None
+
+    def test_save_download_results_batch(self, test_db_memory):
+        """Test saving a batch of results and metrics in one transaction"""
+        results = [
+            DownloadResult(success=True, url="url1", file_size=1000, download_time=10.0),
+            DownloadResult(success=False, url="url2", error="Download failed")
+        ]
+
+        test_db_memory.save_download_results("batch-job", results)
+
+        assert len(test_db_memory.get_download_results("batch-job")) == 2
+        metrics = test_db_memory.get_metrics()
+        assert metrics.total_downloads == 2
+        assert metrics.successful_downloads == 1
+        assert metrics.total_bytes_downloaded == 1000
@@ -0,0 +1,212 @@
+"""Test downloader retry and congestion handling"""
+
+import io
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import Mock, patch
+
+import pytest
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import DownloadError
+
+from core.downloader import YouTubeDownloader, _retry_after
+
+def _download_error(status, headers=None):
+    """Build the DownloadError yt-dlp raises for an HTTP failure"""
+    response = Response(io.BytesIO(b''), 'https://www.youtube.com/watch?v=abc', headers or {}, status=status)
+    http_error = HTTPError(response)
+    return DownloadError(f'ERROR: unable to download video data: {http_error}',
+                         (HTTPError, http_error, None))
+
+class TestRetryAfter:
+    def test_delta_seconds(self):
+        """Test a Retry-After in seconds is read from the wrapped HTTPError"""
+        assert _retry_after(_download_error(429, {'Retry-After': '120'})) == 120.0
+
+    def test_http_date(self):
+        """Test a Retry-After HTTP-date becomes the seconds remaining until then"""
+        when = datetime.now(timezone.utc) + timedelta(seconds=90)
+        delay = _retry_after(_download_error(503, {'Retry-After': format_datetime(when, usegmt=True)}))
+        assert 85 <= delay <= 90
+
+    def test_past_date_is_zero(self):
+        """Test a date already in the past means no wait"""
+        when = datetime.now(timezone.utc) - timedelta(hours=1)
+        assert _retry_after(_download_error(429, {'Retry-After': format_datetime(when, usegmt=True)})) == 0.0
+
+    def test_missing_or_invalid(self):
+        """Test errors without a usable header yield None"""
+        assert _retry_after(_download_error(429)) is None
+        assert _retry_after(_download_error(429, {'Retry-After': 'soon'})) is None
+        assert _retry_after(ValueError('boom')) is None
+
+    def test_chained_cause(self):
+        """Test the header is found through __cause__ as well as exc_info"""
+        try:
+            raise RuntimeError('wrapped') from _download_error(429, {'Retry-After': '7'})
+        except RuntimeError as e:
+            assert _retry_after(e) == 7.0
+
+@pytest.fixture
+def downloader(mock_config):
+    """Downloader without cookie extraction whose waits return immediately"""
+    mock_config.config['use_cookies'] = False
+    mock_config.config['max_retries'] = 2
+    downloader = YouTubeDownloader(mock_config)
+    downloader._stop_event = Mock()
+    downloader._stop_event.is_set.return_value = False
+    downloader._stop_event.wait.return_value = False
+    return downloader
+
+@pytest.fixture
+def ydl():
+    """Patch YoutubeDL and return the instance used inside the with-block"""
+    with patch('core.downloader.YoutubeDL') as mock_ydl:
+        instance = Mock()
+        mock_ydl.return_value.__enter__.return_value = instance
+        mock_ydl.return_value.__exit__.return_value = None
+        instance.opts = mock_ydl
+        yield instance
+
+class TestDownloadSingleVideo:
+    URL = 'https://www.youtube.com/watch?v=abc'
+
+    def test_success_lowers_congestion(self, downloader, ydl):
+        """Test a successful download eases congestion"""
+        downloader._congestion = 3
+        ydl.extract_info.return_value = {'title': 'Test Video', 'duration': 120}
+
+        result = downloader.download_single_video(self.URL)
+
+        assert result['success'] and result['title'] == 'Test Video'
+        assert downloader._congestion == 2
+
+    def test_errors_are_not_ignored(self, downloader, ydl):
+        """Test HTTP errors are raised by yt-dlp rather than swallowed into a None result"""
+        ydl.extract_info.return_value = {'title': 'Test Video'}
+        downloader.download_single_video(self.URL)
+        assert ydl.opts.call_args.args[0]['ignoreerrors'] is False
+
+    def test_none_info_is_a_failure(self, downloader, ydl):
+        """Test a None result is not counted as a success"""
+        downloader._congestion = 3
+        ydl.extract_info.return_value = None
+
+        result = downloader.download_single_video(self.URL)
+
+        assert not result['success']
+        assert downloader._congestion == 3
+
+    def test_rate_limit_raises_congestion_and_honours_retry_after(self, downloader, ydl):
+        """Test a 429 raises congestion and the retry waits for the server's Retry-After"""
+        ydl.extract_info.side_effect = [
+            _download_error(429, {'Retry-After': '42'}),
+            {'title': 'Test Video'},
+        ]
+
+        with patch.object(downloader, '_admission_delay', return_value=0.0):
+            result = downloader.download_single_video(self.URL)
+
+        assert result['success']
+        # Raised by the 429, lowered again by the success
+        assert downloader._congestion == 0
+        assert 42.0 in [call.kwargs['timeout'] for call in downloader._stop_event.wait.call_args_list]
+
+    def test_retries_use_jittered_backoff(self, downloader, ydl):
+        """Test retries without Retry-After use the jittered delay until retries run out"""
+        ydl.extract_info.side_effect = _download_error(503)
+
+        with patch.object(downloader, '_calculate_retry_delay', return_value=3.0) as delay:
+            result = downloader.download_single_video(self.URL)
+
+        assert not result['success'] and 'HTTP Error 503' in result['error']
+        assert ydl.extract_info.call_count == 3
+        assert delay.call_count == 2
+
+    def test_permanent_error_not_retried(self, downloader, ydl):
+        """Test errors outside the retryable set fail on the first attempt"""
+        ydl.extract_info.side_effect = DownloadError('ERROR: Video unavailable')
+
+        result = downloader.download_single_video(self.URL)
+
+        assert not result['success']
+        assert ydl.extract_info.call_count == 1
+
+class FakePlaylistYDL:
+    """YoutubeDL stand-in that serves flat playlists and records peak download concurrency"""
+
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    fail_downloads = False
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True):
+        cls = type(self)
+        if not download:
+            return {'id': url[-1], 'title': f'Playlist {url[-1]}',
+                    'entries': [{'url': f'https://youtu.be/{url[-1]}{n}'} for n in range(4)]}
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        time.sleep(0.02)
+        with cls.lock:
+            cls.running -= 1
+        if cls.fail_downloads:
+            raise DownloadError('ERROR: Video unavailable')
+        return {'title': url}
+
+class TestPlaylists:
+    @pytest.fixture
+    def fake_ydl(self):
+        """Fresh FakePlaylistYDL counters for each test"""
+        fake = type('FakeYDL', (FakePlaylistYDL,), {'running': 0, 'peak': 0})
+        with patch('core.downloader.YoutubeDL', fake):
+            yield fake
+
+    def test_concurrency_capped_across_playlists(self, downloader, fake_ydl):
+        """Test nested playlist pools share the max_workers limit"""
+        downloader.config.config['max_workers'] = 2
+        downloader._extraction_slots = threading.BoundedSemaphore(2)
+        urls = [f'https://www.youtube.com/playlist?list=PL{n}' for n in range(3)]
+
+        results = downloader.download_multiple_urls(urls)
+
+        assert all(r['success'] and r['downloaded_entries'] == 4 for r in results)
+        assert fake_ydl.peak <= 2
+
+    def test_playlist_with_no_downloads_fails(self, downloader, fake_ydl):
+        """Test a playlist whose entries all failed is reported as a failure"""
+        fake_ydl.fail_downloads = True
+
+        result = downloader.download_playlist('https://www.youtube.com/playlist?list=PL1')
+
+        assert not result['success']
+        assert result['entry_count'] == 4 and result['downloaded_entries'] == 0
+
+class TestRetryHelpers:
+    def test_retry_delay_bounds(self, downloader):
+        """Test decorrelated jitter stays within [base, min(cap, 3 * previous)]"""
+        for _ in range(100):
+            assert 2 <= downloader._calculate_retry_delay(None, False) <= 6
+            assert 5 <= downloader._calculate_retry_delay(1000, True) <= downloader.MAX_RETRY_DELAY
+
+    def test_congestion_is_clamped(self, downloader):
+        """Test congestion never drops below zero or rises past the maximum"""
+        downloader._adjust_congestion(-1)
+        assert downloader._congestion == 0
+        assert downloader._admission_delay() == 0.0
+        for _ in range(20):
+            downloader._adjust_congestion(1)
+        assert downloader._congestion == downloader.MAX_CONGESTION
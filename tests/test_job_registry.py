@@ -0,0 +1,158 @@
+"""Test the Redis-backed job registry"""
+
+import time
+
+import pytest
+
+from youtube_downloader.api.job_registry import JobRegistry
+from youtube_downloader.models.data_models import DownloadJob
+
+class FakeRedis:
+    """In-memory stand-in for the hash, sorted-set and pub/sub commands JobRegistry uses
+
+    EVAL runs a Python port of the registered scripts, so the tests cover how the
+    registry calls a script and reads its reply, not Redis' Lua engine itself.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.zsets = {}
+        self.ttls = {}
+        self.published = []
+        self.scripts = {JobRegistry._MARK_CANCELLED_LUA: self._mark_cancelled}
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    async def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    async def delete(self, key):
+        self.hashes.pop(key, None)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def eval(self, script, numkeys, *args):
+        return self.scripts[script](args[:numkeys], args[numkeys:])
+
+    def _mark_cancelled(self, keys, argv):
+        if keys[0] not in self.hashes:
+            return 0
+        self.hashes[keys[0]]["status"] = "cancelled"
+        self.published.append((argv[0], argv[1]))
+        return 1
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    """Queues commands and runs them against the FakeRedis on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __getattr__(self, name):
+        command = getattr(self.redis, name)
+        return lambda *args, **kwargs: self.commands.append(command(*args, **kwargs))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+@pytest.fixture
+def registry():
+    """JobRegistry wired to the in-memory fake"""
+    registry = JobRegistry()
+    registry.redis = FakeRedis()
+    return registry
+
+def _job(job_id="job-1", status="running"):
+    """Build a DownloadJob with the given id and status"""
+    return DownloadJob(id=job_id, urls=["https://youtu.be/abc"], config=None, status=status)
+
+class TestJobRegistry:
+    async def test_register_mirrors_status(self, registry):
+        """Test a registered job is counted and readable from Redis"""
+        await registry.register(_job())
+
+        assert await registry.count() == 1
+        assert registry.redis.hashes["ytd:job:job-1"]["status"] == "running"
+        assert registry.redis.ttls["ytd:job:job-1"] == JobRegistry.JOB_TTL
+        assert (JobRegistry.EVENTS_CHANNEL, "job-1:running") in registry.redis.published
+
+    async def test_unregister_removes_job(self, registry):
+        """Test an unregistered job is no longer counted or reported"""
+        await registry.register(_job())
+        await registry.unregister("job-1")
+
+        assert await registry.count() == 0
+        assert registry.get_local("job-1") is None
+        assert await registry.get_status("job-1") is None
+
+    async def test_stale_jobs_stop_counting(self, registry):
+        """Test jobs of a worker that stopped heartbeating are trimmed from the count"""
+        await registry.register(_job("live"))
+        registry.redis.zsets[JobRegistry.ACTIVE_KEY]["crashed"] = time.time() - JobRegistry.STALE_AFTER - 1
+
+        assert await registry.count() == 1
+        assert "crashed" not in registry.redis.zsets[JobRegistry.ACTIVE_KEY]
+
+    async def test_heartbeat_refreshes_local_jobs(self, registry):
+        """Test a heartbeat keeps long-running jobs from going stale"""
+        await registry.register(_job())
+        registry.redis.zsets[JobRegistry.ACTIVE_KEY]["job-1"] = 0.0
+
+        await registry.heartbeat()
+
+        assert await registry.count() == 1
+
+    async def test_mark_cancelled_running_job(self, registry):
+        """Test another worker's running job is flagged cancelled"""
+        other = JobRegistry()
+        other.redis = registry.redis
+        await other.register(_job())
+
+        assert await registry.mark_cancelled("job-1") is True
+        assert await registry.is_cancelled("job-1")
+        assert (JobRegistry.EVENTS_CHANNEL, "job-1:cancelled") in registry.redis.published
+
+    async def test_mark_cancelled_finished_job(self, registry):
+        """Test a job that already finished is not resurrected as an orphan hash"""
+        assert await registry.mark_cancelled("job-1") is False
+        assert "ytd:job:job-1" not in registry.redis.hashes
+
+    async def test_without_redis(self):
+        """Test the registry falls back to process-local tracking"""
+        registry = JobRegistry()
+        await registry.register(_job())
+
+        assert await registry.count() == 1
+        assert (await registry.get_status("job-1"))["status"] == "running"
+        assert await registry.mark_cancelled("job-1") is False
@@ -0,0 +1,210 @@
+"""Test inter-service message serialization and the Redis Streams queue"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from redis.exceptions import ResponseError
+
+from shared import messaging
+from shared.messaging import MessageBus, MessageQueue
+from shared.models import MessageType, ServiceMessage
+
+def _message(payload=None):
+    """Build a ServiceMessage with a fixed id and timestamp"""
+    return ServiceMessage(
+        message_id="msg-1",
+        message_type=MessageType.JOB_PROGRESS,
+        service="test",
+        timestamp=datetime(2024, 1, 2, 3, 4, 5),
+        correlation_id="job-1",
+        payload=payload if payload is not None else {"progress": 42.5}
+    )
+
+class TestSerialization:
+    def test_round_trip(self):
+        """Test every field survives encoding and decoding"""
+        message = _message()
+        assert MessageQueue._deserialize_message(MessageQueue._serialize_message(message)) == message
+
+    def test_non_str_keys(self):
+        """Test int-keyed payload dicts are encoded with string keys"""
+        decoded = MessageQueue._deserialize_message(MessageQueue._serialize_message(_message({1: "a", 2: {3: "b"}})))
+        assert decoded.payload == {"1": "a", "2": {"3": "b"}}
+
+    def test_small_message_is_plain_json(self):
+        """Test uncompressed messages carry no flag byte, so older consumers can read them"""
+        raw = MessageQueue._serialize_message(_message())
+        assert raw.startswith(b"{")
+        assert json.loads(raw)["message_id"] == "msg-1"
+
+    def test_large_message_zstd_round_trip(self):
+        """Test bodies over the threshold are zstd-compressed behind the flag byte"""
+        message = _message({"log": "x" * (messaging.COMPRESSION_THRESHOLD * 4)})
+        raw = MessageQueue._serialize_message(message)
+
+        assert raw[:1] == messaging._ZSTD
+        assert len(raw) < messaging.COMPRESSION_THRESHOLD
+        assert MessageQueue._deserialize_message(raw) == message
+
+    def test_decodes_legacy_messages(self):
+        """Test untagged JSON from json.dumps and raw-flagged JSON both decode"""
+        message = _message()
+        legacy = json.dumps({
+            "message_id": "msg-1",
+            "message_type": "job_progress",
+            "service": "test",
+            "timestamp": "2024-01-02T03:04:05",
+            "correlation_id": "job-1",
+            "payload": {"progress": 42.5}
+        }).encode()
+
+        assert MessageQueue._deserialize_message(legacy) == message
+        assert MessageQueue._deserialize_message(legacy.decode()) == message
+        assert MessageQueue._deserialize_message(messaging._RAW + legacy) == message
+
+class FakeStreamRedis:
+    """In-memory stand-in for the stream commands MessageQueue uses (one consumer per group)"""
+
+    def __init__(self):
+        self.streams = {}
+        self.groups = {}
+
+    async def xadd(self, key, fields, maxlen=None, approximate=False):
+        entries = self.streams.setdefault(key, [])
+        entry_id = f"{len(entries) + 1}-0".encode()
+        entries.append((entry_id, {k.encode(): v for k, v in fields.items()}))
+        return entry_id
+
+    async def xgroup_create(self, key, group, id="0", mkstream=False):
+        if (key, group) in self.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(key, [])
+        self.groups[key, group] = {"delivered": 0, "pending": {}}
+
+    async def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        (key, last_id), = streams.items()
+        state = self.groups[key, group]
+        if last_id == ">":
+            entries = self.streams[key][state["delivered"]:state["delivered"] + count]
+            state["delivered"] += len(entries)
+            state["pending"].update(entries)
+            if not entries:
+                # Stand in for BLOCK so the consumer loop yields
+                await asyncio.sleep(0)
+        else:
+            after = int(last_id.split(b"-")[0] if isinstance(last_id, bytes) else last_id.split("-")[0])
+            entries = [(i, f) for i, f in state["pending"].items() if int(i.split(b"-")[0]) > after][:count]
+        return [[key.encode(), entries]] if entries else []
+
+    async def xack(self, key, group, *ids):
+        pending = self.groups[key, group]["pending"]
+        return sum(pending.pop(entry_id, None) is not None for entry_id in ids)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def xadd(self, *args, **kwargs):
+        self.commands.append(self.redis.xadd(*args, **kwargs))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+@pytest.fixture
+def queue():
+    """MessageQueue wired to the in-memory stream fake"""
+    queue = MessageQueue(group="tests", consumer="tests_1")
+    queue.redis = FakeStreamRedis()
+    return queue
+
+async def _consume_until(queue, message_type, condition):
+    """Run the stream consumer until condition() holds"""
+    queue._running = True
+    task = asyncio.create_task(queue._consume_stream(message_type))
+    try:
+        for _ in range(1000):
+            if condition():
+                break
+            await asyncio.sleep(0)
+    finally:
+        queue._running = False
+        await task
+
+class TestStreamQueue:
+    STREAM = "stream:job_progress"
+
+    async def test_publish_is_a_single_xadd(self, queue):
+        """Test publish appends the encoded message to its type's stream"""
+        await queue.publish(_message())
+
+        (entry_id, fields), = queue.redis.streams[self.STREAM]
+        assert MessageQueue._deserialize_message(fields[b"data"]) == _message()
+
+    async def test_publish_many_pipelines_xadds(self, queue):
+        """Test a batch lands in the stream in order"""
+        await queue.publish_many([_message({"n": n}) for n in range(3)])
+
+        payloads = [MessageQueue._deserialize_message(f[b"data"]).payload for _, f in queue.redis.streams[self.STREAM]]
+        assert payloads == [{"n": 0}, {"n": 1}, {"n": 2}]
+
+    async def test_consumer_dispatches_and_acks(self, queue):
+        """Test handled entries reach every subscriber and are acknowledged"""
+        received = []
+
+        async def handler(message):
+            received.append(message.payload)
+
+        await queue.subscribe(MessageType.JOB_PROGRESS, handler)
+        await queue.publish_many([_message({"n": n}) for n in range(3)])
+
+        await _consume_until(queue, MessageType.JOB_PROGRESS, lambda: len(received) == 3)
+
+        assert received == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert queue.redis.groups[self.STREAM, "tests"]["pending"] == {}
+
+    async def test_failed_entry_stays_pending_and_is_redelivered(self, queue):
+        """Test an entry whose handler raised is left unacknowledged and retried"""
+        queue.PENDING_RETRY_INTERVAL = 0
+        attempts = []
+
+        async def flaky(message):
+            attempts.append(message.payload["n"])
+            if attempts.count(1) == 1 and message.payload["n"] == 1:
+                raise RuntimeError("transient")
+
+        await queue.subscribe(MessageType.JOB_PROGRESS, flaky)
+        await queue.publish_many([_message({"n": n}) for n in range(3)])
+
+        await _consume_until(queue, MessageType.JOB_PROGRESS, lambda: attempts.count(1) == 2)
+
+        assert attempts.count(0) == 1 and attempts.count(2) == 1
+        assert queue.redis.groups[self.STREAM, "tests"]["pending"] == {}
+
+    async def test_existing_group_is_reused(self, queue):
+        """Test a BUSYGROUP reply is not treated as an error"""
+        await queue._ensure_stream_group(self.STREAM)
+        await queue._ensure_stream_group(self.STREAM)
+        assert (self.STREAM, "tests") in queue.redis.groups
+
+    async def test_bus_flushes_buffered_messages(self, queue):
+        """Test publish_nowait messages are written by the flusher in one batch"""
+        bus = MessageBus(group="tests")
+        bus.queue = queue
+        for n in range(3):
+            bus.publish_nowait(_message({"n": n}))
+
+        await bus._flush()
+
+        assert len(queue.redis.streams[self.STREAM]) == 3
@@ -0,0 +1,49 @@
+"""Test the persistent URL classification cache"""
+
+import pytest
+
+from utils import url_cache
+from utils.url_cache import UrlCache, canonicalize_url
+
+class TestCanonicalizeUrl:
+    def test_youtu_be_rewritten_to_watch_url(self):
+        """Test short links become canonical watch URLs"""
+        assert canonicalize_url("https://youtu.be/abc123?si=track") == "https://www.youtube.com/watch?v=abc123"
+        assert canonicalize_url("youtu.be/abc123?list=PL1") == "https://www.youtube.com/watch?v=abc123&list=PL1"
+
+    def test_only_v_and_list_kept(self):
+        """Test tracking parameters are dropped and host variants collapse"""
+        assert (canonicalize_url("https://m.youtube.com/watch?v=abc&t=42&si=x&list=PL1&index=3")
+                == "https://www.youtube.com/watch?v=abc&list=PL1")
+        assert canonicalize_url("http://www.youtube.com/@chan/") == "https://www.youtube.com/@chan"
+
+    def test_non_youtube_url_unchanged(self):
+        """Test other hosts are passed through as-is"""
+        assert canonicalize_url("https://vimeo.com/1?a=b") == "https://vimeo.com/1?a=b"
+
+class TestUrlCache:
+    def test_set_and_get_shares_canonical_key(self, temp_dir):
+        """Test equivalent URL forms hit the same entry"""
+        cache = UrlCache(str(temp_dir / 'cache.db'))
+        assert cache.get("https://www.youtube.com/watch?v=abc") is None
+
+        cache.set("https://youtu.be/abc?si=x", "live")
+        assert cache.get("https://www.youtube.com/watch?v=abc") == "live"
+
+    def test_entries_expire_after_ttl(self, temp_dir, monkeypatch):
+        """Test entries older than the TTL are ignored"""
+        now = 1_000_000
+        monkeypatch.setattr(url_cache.time, 'time', lambda: now)
+        cache = UrlCache(str(temp_dir / 'cache.db'), ttl=60)
+        cache.set("https://youtu.be/abc", "video")
+
+        now += 59
+        assert cache.get("https://youtu.be/abc") == "video"
+        now += 2
+        assert cache.get("https://youtu.be/abc") is None
+
+    def test_unavailable_database_disables_cache(self, temp_dir):
+        """Test an unopenable cache path degrades to a no-op"""
+        cache = UrlCache(str(temp_dir / 'missing' / 'cache.db'))
+        cache.set("https://youtu.be/abc", "video")
+        assert cache.get("https://youtu.be/abc") is None
@@ -0,0 +1,92 @@
+"""Test URL scanning and classification"""
+
+from unittest.mock import patch
+
+import pytest
+
+from core import url_handler
+from core.url_handler import scan_urls, get_content_type, validate_youtube_url
+from utils.url_cache import UrlCache
+
+class TestScanUrls:
+    def test_splits_on_commas_and_whitespace(self):
+        """Test tokens are separated by commas, spaces and newlines alike"""
+        text = "https://youtu.be/a, https://www.youtube.com/watch?v=b\n\thttps://youtube.com/@chan\n"
+        assert scan_urls(text) == (
+            ["https://youtu.be/a", "https://www.youtube.com/watch?v=b", "https://youtube.com/@chan"],
+            []
+        )
+
+    def test_other_urls_reported_and_junk_dropped(self):
+        """Test non-YouTube URLs are returned separately and non-URLs are ignored"""
+        text = "https://vimeo.com/1 hello youtube.com/watch?v=x https://youtube.com ftp://h/p https://youtu.be/a"
+        assert scan_urls(text) == (
+            ["https://youtu.be/a"],
+            ["https://vimeo.com/1", "https://youtube.com", "ftp://h/p"]
+        )
+
+    def test_agrees_with_validate_youtube_url(self):
+        """Test every scanned YouTube URL passes validation and every other URL fails it"""
+        youtube, other = scan_urls("HTTPS://WWW.YOUTUBE.COM/shorts/x http://youtu.be/y https://m.youtube.com/z")
+        assert youtube == ["HTTPS://WWW.YOUTUBE.COM/shorts/x", "http://youtu.be/y"]
+        assert all(validate_youtube_url(url) for url in youtube)
+        assert not any(validate_youtube_url(url) for url in other)
+
+    def test_empty_input(self):
+        """Test blank input yields nothing"""
+        assert scan_urls("") == ([], [])
+        assert scan_urls(" ,\n ") == ([], [])
+
+class TestContentType:
+    @pytest.mark.parametrize("url, expected", [
+        ("https://www.youtube.com/watch?v=abc", "video"),
+        ("https://youtu.be/abc", "video"),
+        ("https://www.youtube.com/shorts/abc", "shorts"),
+        ("https://www.youtube.com/live/abc", "live"),
+        ("https://www.youtube.com/playlist?list=PL1", "playlist"),
+        ("https://www.youtube.com/@chan", "channel"),
+        ("https://www.youtube.com/channel/UC1", "channel"),
+        ("https://www.youtube.com/c/name", "channel"),
+        ("https://WWW.YOUTUBE.COM/SHORTS/abc", "shorts"),
+    ])
+    def test_classifies_from_url(self, url, expected):
+        """Test URL-only classification of each supported form"""
+        assert get_content_type(url) == expected
+
+    @pytest.mark.parametrize("url, expected", [
+        # A video inside a playlist is routed as the playlist
+        ("https://www.youtube.com/watch?v=abc&list=PL1", "playlist"),
+        # Earlier types in the priority order win regardless of position in the URL
+        ("https://www.youtube.com/@chan/shorts/abc", "shorts"),
+        ("https://www.youtube.com/@chan/live/abc", "live"),
+        ("https://www.youtube.com/channel/UC1?list=PL1", "playlist"),
+    ])
+    def test_priority_when_several_markers_match(self, url, expected):
+        """Test the documented shorts > live > playlist > channel priority"""
+        assert get_content_type(url) == expected
+
+class TestProbe:
+    URL = "https://www.youtube.com/watch?v=abc"
+
+    @pytest.fixture
+    def url_cache(self, temp_dir):
+        """Point probes at a throwaway UrlCache"""
+        cache = UrlCache(str(temp_dir / 'cache.db'))
+        with patch.object(url_handler, '_get_url_cache', return_value=cache):
+            yield cache
+
+    def test_failed_probe_is_retried(self, url_cache):
+        """Test a failed probe is neither cached nor pinned in memory"""
+        with patch.object(url_handler, '_get_url_info_network', return_value=('video', {})) as probe:
+            assert get_content_type(self.URL, probe=True) == 'video'
+            assert get_content_type(self.URL, probe=True) == 'video'
+        assert probe.call_count == 2
+        assert url_cache.get(self.URL) is None
+
+    def test_successful_probe_served_from_url_cache(self, url_cache):
+        """Test a real probe result is stored in and then read from the UrlCache"""
+        with patch.object(url_handler, '_get_url_info_network', return_value=('live', {'is_live': True})) as probe:
+            assert get_content_type(self.URL, probe=True) == 'live'
+            assert get_content_type(self.URL, probe=True) == 'live'
+        assert probe.call_count == 1
+        assert url_cache.get(self.URL) == 'live'
@@ -1,12 +1,21 @@
 """Enterprise-grade REST API for YouTube Downloader"""
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query
+from fastapi import (
+    FastAPI, HTTPException, BackgroundTasks, Depends, Query, Request, Response,
+    WebSocket, WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from typing import List, Optional, Dict, Any
+from fastapi.responses import FileResponse, ORJSONResponse
+from typing import Callable, List, Optional, Dict, Any, Tuple, Set
 import uuid
+import time
+import dataclasses
+import json
+import hashlib
+import shutil
 from datetime import datetime
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 import os
@@ -27,26 +36,47 @@ class DownloadRequest(BaseModel):
     audio_only: bool = False
     output_path: Optional[str] = None
     max_workers: Optional[int] = None
-from youtube_downloader.models.database import DatabaseManager
+from youtube_downloader.models.database import DatabaseManager, AsyncDatabaseManager
 from youtube_downloader.config.config_manager import ConfigManager
 from youtube_downloader.core.downloader import YouTubeDownloader
 from youtube_downloader.core.url_handler import validate_youtube_url, get_content_type
 from youtube_downloader.utils.logger import setup_logger
+from youtube_downloader.api.job_registry import JobRegistry
 
 # Initialize components
 logger = setup_logger(__name__)
 db = DatabaseManager()
+# Awaitable view of db for request handlers; SQLite calls run in worker threads
+async_db = AsyncDatabaseManager(db)
 config = ConfigManager()
 
-# Global job tracker
-active_jobs: Dict[str, DownloadJob] = {}
+# Running jobs; shared across uvicorn workers when YTD_REDIS_URL is set
+job_registry = JobRegistry(os.getenv('YTD_REDIS_URL'))
+
+# Write-behind queue for job status transitions: one transaction per batch
+JOB_WRITE_BATCH = 100
+JOB_WRITE_WAIT = 0.05
+job_write_queue: asyncio.Queue = asyncio.Queue()
+
+# Live progress subscribers per job (WebSocket clients of this worker)
+PROGRESS_QUEUE_SIZE = 256
+progress_subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+# Short-lived snapshot of metrics + disk usage for /health and /metrics polling
+METRICS_TTL = 2.0
+_metrics_cache: Dict[str, Any] = {'snapshot': None, 'expires': 0.0}
+_metrics_lock = asyncio.Lock()
+
+# Conditional-GET caching for endpoints polled by load balancers and dashboards
+CACHE_CONTROL = "max-age=2, must-revalidate"
 
 app = FastAPI(
     title=" The ACJ's sYouTube Downloader API",
     description="Enterprise-grade YouTube download service with REST API",
     version="4.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -62,67 +92,206 @@ app.add_middleware(
 async def startup_event():
     """Initialize application on startup"""
     logger.info("Starting YouTube Downloader API v4.0.0")
+    await job_registry.connect()
+    # Dedicated pool so download jobs don't queue behind the loop's default executor
+    app.state.download_executor = ThreadPoolExecutor(
+        max_workers=config.get('max_workers', 3) * 4,
+        thread_name_prefix='ytd'
+    )
+    app.state.job_writer = asyncio.create_task(_job_writer())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down YouTube Downloader API")
+    app.state.download_executor.shutdown(wait=False, cancel_futures=True)
+    app.state.job_writer.cancel()
+    await _flush_job_writes()
+    await job_registry.close()
+
+def queue_job_save(job: DownloadJob) -> None:
+    """Persist a snapshot of a job via the write-behind queue"""
+    job_write_queue.put_nowait(dataclasses.replace(job))
+
+async def _job_writer() -> None:
+    """Drain queued job saves, writing up to JOB_WRITE_BATCH per transaction"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await job_write_queue.get()]
+        deadline = loop.time() + JOB_WRITE_WAIT
+        while len(batch) < JOB_WRITE_BATCH:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(job_write_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await _write_jobs(batch)
+
+async def _write_jobs(batch: List[DownloadJob]) -> None:
+    """Write a batch of job snapshots off the event loop"""
+    try:
+        await async_db.save_download_jobs(batch)
+    except Exception as e:
+        logger.error(f"Failed to persist {len(batch)} job updates: {e}")
+
+async def _flush_job_writes() -> None:
+    """Write whatever is left in the job write queue"""
+    batch = []
+    while not job_write_queue.empty():
+        batch.append(job_write_queue.get_nowait())
+    if batch:
+        await _write_jobs(batch)
+
+def _publish_progress(job_id: str, event: Optional[Dict[str, Any]]) -> None:
+    """Fan a progress event out to the job's subscribers; None closes their streams"""
+    for queue in progress_subscribers.get(job_id, ()):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop intermediate progress rather than buffer without bound
+            if event is None or event.get('type') == 'status':
+                queue.get_nowait()
+                queue.put_nowait(event)
+
+def _publish_status(job: DownloadJob) -> None:
+    """Publish a job status transition to progress subscribers"""
+    _publish_progress(job.id, {'type': 'status', 'job_id': job.id, 'status': job.status, 'error': job.error})
+
+def _progress_event(d: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the JSON-safe fields of a yt-dlp progress dict"""
+    return {
+        'type': 'progress',
+        'status': d.get('status'),
+        'filename': os.path.basename(d.get('filename') or ''),
+        'downloaded_bytes': d.get('downloaded_bytes'),
+        'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate'),
+        'speed': d.get('speed'),
+        'eta': d.get('eta'),
+    }
+
+def _progress_hook(loop: asyncio.AbstractEventLoop, job_id: str) -> Callable[[Dict[str, Any]], None]:
+    """yt-dlp progress hook that forwards events from download threads to the event loop"""
+    def hook(d: Dict[str, Any]) -> None:
+        # During shutdown the loop may close while downloads are still running; losing
+        # a progress event is fine, raising here would abort the download
+        if loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(_publish_progress, job_id, _progress_event(d))
+        except RuntimeError:
+            pass
+    return hook
 
-async def get_db() -> DatabaseManager:
+async def get_db() -> AsyncDatabaseManager:
     """Dependency for database access"""
-    return db
+    return async_db
 
 async def get_config() -> ConfigManager:
     """Dependency for configuration access"""
     return config
 
+async def get_metrics_cached(db: AsyncDatabaseManager) -> Tuple[DownloadMetrics, Dict[str, Any]]:
+    """Get download metrics and disk usage, cached for METRICS_TTL seconds
+
+    Only one coroutine refreshes at a time; concurrent callers are served
+    the previous snapshot while the refresh is in flight.
+    """
+    cached = _metrics_cache.get('snapshot')
+    if cached and time.monotonic() < _metrics_cache['expires']:
+        return cached
+    if cached and _metrics_lock.locked():
+        return cached
+
+    async with _metrics_lock:
+        # Another coroutine may have refreshed while we waited for the lock
+        if _metrics_cache.get('snapshot') and time.monotonic() < _metrics_cache['expires']:
+            return _metrics_cache['snapshot']
+
+        metrics, disk_usage = await asyncio.gather(db.get_metrics(), _disk_usage())
+        _metrics_cache['snapshot'] = (metrics, disk_usage)
+        _metrics_cache['expires'] = time.monotonic() + METRICS_TTL
+        return _metrics_cache['snapshot']
+
+async def _disk_usage() -> Dict[str, Any]:
+    """Disk usage of the root filesystem, read off the event loop"""
+    usage = await asyncio.to_thread(shutil.disk_usage, '/')
+    return {
+        "total": usage.total,
+        "used": usage.used,
+        "free": usage.free,
+        "percent": round(usage.used / (usage.used + usage.free) * 100, 1) if usage.total else 0.0
+    }
+
+def _weak_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values a response is derived from"""
+    return 'W/"%s"' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set caching headers; return a 304 response if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 @app.get("/health", response_model=SystemHealth)
-async def health_check(db: DatabaseManager = Depends(get_db)):
+async def health_check(request: Request, response: Response, db: AsyncDatabaseManager = Depends(get_db)):
     """Health check endpoint"""
     try:
-        # Check database connectivity
-        metrics = db.get_metrics()
+        # Check database connectivity and get system info
+        metrics, disk_usage = await get_metrics_cached(db)
 
-        # Get system info
-        import psutil
-        disk_usage = psutil.disk_usage('/')
+        active_downloads = await job_registry.count()
+
+        etag = _weak_etag(metrics.total_downloads, active_downloads, disk_usage["percent"])
+        not_modified = _not_modified(request, response, etag)
+        if not_modified:
+            return not_modified
 
         return SystemHealth(
             status="healthy",
             uptime=0.0,  # Would need to track actual uptime
-            active_downloads=len(active_jobs),
+            active_downloads=active_downloads,
             total_downloads=metrics.total_downloads,
-            disk_usage={
-                "total": disk_usage.total,
-                "used": disk_usage.used,
-                "free": disk_usage.free,
-                "percent": disk_usage.percent
-            }
+            disk_usage=disk_usage
         )
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
 @app.get("/metrics", response_model=DownloadMetrics)
-async def get_metrics(db: DatabaseManager = Depends(get_db)):
+async def get_metrics(request: Request, response: Response, db: AsyncDatabaseManager = Depends(get_db)):
     """Get download metrics"""
-    return db.get_metrics()
+    metrics, _ = await get_metrics_cached(db)
+
+    etag = _weak_etag(metrics.total_downloads, metrics.last_updated.isoformat())
+    not_modified = _not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    return metrics
 
 @app.post("/downloads", response_model=Dict[str, str])
 async def create_download_job(
     request: DownloadRequest,
     background_tasks: BackgroundTasks,
-    db: DatabaseManager = Depends(get_db),
+    db: AsyncDatabaseManager = Depends(get_db),
     config: ConfigManager = Depends(get_config)
 ):
     """Create a new download job"""
-    # Validate URLs
-    valid_urls = []
+    # Validate and deduplicate URLs in one pass, keeping request order
+    seen = set()
+    valid_urls, invalid_urls = [], []
     for url in request.urls:
-        if validate_youtube_url(url):
-            valid_urls.append(url)
-        else:
-            raise HTTPException(status_code=400, detail=f"Invalid YouTube URL: {url}")
+        if url in seen:
+            continue
+        seen.add(url)
+        (valid_urls if validate_youtube_url(url) else invalid_urls).append(url)
+
+    if invalid_urls:
+        raise HTTPException(status_code=400, detail=f"Invalid YouTube URLs: {', '.join(invalid_urls)}")
 
     if not valid_urls:
         raise HTTPException(status_code=400, detail="No valid YouTube URLs provided")
@@ -144,8 +313,8 @@ async def create_download_job(
     )
 
     # Save to database
-    db.save_download_job(job)
-    active_jobs[job_id] = job
+    await db.save_download_job(job)
+    await job_registry.register(job)
 
     # Start background download
     background_tasks.add_task(process_download_job, job_id)
@@ -155,7 +324,7 @@ async def create_download_job(
 async def process_download_job(job_id: str):
     """Process a download job in the background"""
     try:
-        job = active_jobs.get(job_id)
+        job = job_registry.get_local(job_id)
         if not job:
             logger.error(f"Job {job_id} not found in active jobs")
             return
@@ -163,11 +332,12 @@ async def process_download_job(job_id: str):
         # Update job status
         job.status = "running"
         job.started_at = datetime.now()
-        db.save_download_job(job)
+        queue_job_save(job)
+        await job_registry.update(job)
+        _publish_status(job)
 
-        # Create a temporary config manager from job config
-        temp_config = ConfigManager()
-        temp_config.config.update({
+        # Derive a job-specific config from the already-loaded one
+        temp_config = config.clone_with({
             'output_path': str(job.config.output_path),
             'audio_only': job.config.audio_only,
             'max_workers': job.config.max_workers,
@@ -175,67 +345,121 @@ async def process_download_job(job_id: str):
             'enable_sponsorblock': getattr(job.config, 'enable_sponsorblock', False),
         })
 
-        # Initialize downloader
+        # Initialize downloader; yt-dlp calls the hook from executor threads
         downloader = YouTubeDownloader(temp_config)
+        downloader.progress_hook = _progress_hook(asyncio.get_running_loop(), job_id)
 
         # Process downloads
-        results = await asyncio.get_event_loop().run_in_executor(
-            None, downloader.download_multiple_urls, job.urls, job.config.audio_only
+        results = await downloader.download_multiple_urls_async(
+            job.urls, job.config.audio_only, executor=app.state.download_executor
         )
 
-        # Save results
-        for result in results:
-            db.save_download_result(job_id, result)
+        results = [_to_download_result(result) for result in results]
+
+        # Save results and update metrics in one transaction
+        await async_db.save_download_results(job_id, results)
 
-        # Update metrics
-        db.update_metrics(results)
+        # Don't overwrite a cancellation issued (by any worker) while downloading
+        if job.status == "cancelled" or await job_registry.is_cancelled(job_id):
+            logger.info(f"Job {job_id} was cancelled")
+            return
 
         # Update job status
         job.status = "completed"
         job.completed_at = datetime.now()
         job.results = results
-        db.save_download_job(job)
+        queue_job_save(job)
+        _publish_status(job)
 
         logger.info(f"Job {job_id} completed successfully")
 
     except Exception as e:
         logger.error(f"Job {job_id} failed: {e}")
-        job = active_jobs.get(job_id)
+        job = job_registry.get_local(job_id)
         if job:
             job.status = "failed"
             job.error = str(e)
             job.completed_at = datetime.now()
-            db.save_download_job(job)
+            queue_job_save(job)
+            _publish_status(job)
     finally:
-        # Clean up active jobs
-        active_jobs.pop(job_id, None)
+        # Clean up active jobs and close progress streams
+        await job_registry.unregister(job_id)
+        _publish_progress(job_id, None)
+
+# Downloader result keys that map onto DownloadResult fields; the rest go into metadata
+_RESULT_FIELDS = {'success', 'url', 'title', 'duration', 'error', 'type'}
+
+def _to_download_result(result: Dict[str, Any]) -> DownloadResult:
+    """Convert a downloader result dict into a DownloadResult"""
+    metadata = {key: value for key, value in result.items() if key not in _RESULT_FIELDS}
+    return DownloadResult(
+        success=result.get('success', False),
+        url=result.get('url', ''),
+        title=result.get('title'),
+        duration=result.get('duration'),
+        error=result.get('error'),
+        content_type=result.get('type'),
+        metadata=metadata or None
+    )
 
 @app.get("/downloads/{job_id}", response_model=DownloadJob)
-async def get_download_job(job_id: str, db: DatabaseManager = Depends(get_db)):
+async def get_download_job(job_id: str, db: AsyncDatabaseManager = Depends(get_db)):
     """Get download job status and results"""
-    # Check active jobs first
-    if job_id in active_jobs:
-        job = active_jobs[job_id]
+    # Check jobs running in this process first; other workers persist status to the database
+    job = job_registry.get_local(job_id)
+    if job:
         # Load latest results from database
-        job.results = db.get_download_results(job_id)
+        job.results = await db.get_download_results(job_id)
         return job
 
-    # Check database
-    job = db.get_download_job(job_id)
+    # Check database (job and results in one query)
+    job = await db.get_download_job_with_results(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-
-    # Load results
-    job.results = db.get_download_results(job_id)
     return job
 
+@app.websocket("/downloads/{job_id}/ws")
+async def stream_download_progress(websocket: WebSocket, job_id: str):
+    """Stream status and progress events of a running job until it finishes"""
+    await websocket.accept()
+
+    job = job_registry.get_local(job_id)
+    if not job:
+        # Finished, unknown, or running in another worker: report the last known status
+        status = await job_registry.get_status(job_id)
+        if not status:
+            stored = await async_db.get_download_job(job_id)
+            status = {'status': stored.status, 'error': stored.error} if stored else None
+        if status:
+            await websocket.send_json({'type': 'status', 'job_id': job_id,
+                                       'status': status['status'], 'error': status.get('error') or None})
+        await websocket.close(code=1000 if status else 4404)
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PROGRESS_QUEUE_SIZE)
+    progress_subscribers.setdefault(job_id, set()).add(queue)
+    try:
+        await websocket.send_json({'type': 'status', 'job_id': job_id, 'status': job.status, 'error': job.error})
+        while (event := await queue.get()) is not None:
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscribers = progress_subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del progress_subscribers[job_id]
+
 @app.get("/downloads/{job_id}/results", response_model=List[DownloadResult])
-async def get_download_results(job_id: str, db: DatabaseManager = Depends(get_db)):
+async def get_download_results(job_id: str, db: AsyncDatabaseManager = Depends(get_db)):
     """Get download results for a job"""
-    results = db.get_download_results(job_id)
+    results = await db.get_download_results(job_id)
     if not results:
         # Check if job exists
-        job = db.get_download_job(job_id)
+        job = await db.get_download_job(job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
     return results
@@ -245,52 +469,44 @@ async def list_download_jobs(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, description="Maximum number of jobs to return"),
     offset: int = Query(0, description="Number of jobs to skip"),
-    db: DatabaseManager = Depends(get_db)
+    db: AsyncDatabaseManager = Depends(get_db)
 ):
     """List download jobs with optional filtering"""
-    # This is a simplified implementation
-    # In production, you'd want proper pagination and filtering
-    with db._get_connection() as conn:
-        query = "SELECT id, status, created_at FROM download_jobs"
-        params = []
-
-        if status:
-            query += " WHERE status = ?"
-            params.append(status)
-
-        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-
-        rows = conn.execute(query, params).fetchall()
-
-        jobs = []
-        for row in rows:
-            job = db.get_download_job(row['id'])
-            if job:
-                jobs.append(job)
-
-        return {"jobs": jobs, "total": len(jobs)}
+    jobs = await db.list_download_jobs(status, limit, offset)
+    return {"jobs": jobs, "total": len(jobs)}
 
 @app.delete("/downloads/{job_id}")
 async def cancel_download_job(job_id: str):
     """Cancel a running download job"""
-    if job_id in active_jobs:
-        job = active_jobs[job_id]
+    job = job_registry.get_local(job_id)
+    if job:
         job.status = "cancelled"
         job.completed_at = datetime.now()
         job.error = "Cancelled by user"
-        db.save_download_job(job)
-        active_jobs.pop(job_id, None)
+        queue_job_save(job)
+        await job_registry.unregister(job_id)
+        _publish_status(job)
         return {"message": "Job cancelled"}
-    else:
-        raise HTTPException(status_code=404, detail="Job not found or not running")
+
+    # Job running in another worker (flagged only if it is still registered)
+    if await job_registry.mark_cancelled(job_id):
+        job = await async_db.get_download_job(job_id)
+        if job:
+            job.status = "cancelled"
+            job.completed_at = datetime.now()
+            job.error = "Cancelled by user"
+            queue_job_save(job)
+        return {"message": "Job cancelled"}
+
+    raise HTTPException(status_code=404, detail="Job not found or not running")
 
 @app.post("/validate-url")
 async def validate_url(url: str):
     """Validate a YouTube URL"""
     is_valid = validate_youtube_url(url)
     if is_valid:
-        content_type = get_content_type(url)
+        # Ask YouTube (e.g. a live stream behind a watch URL); repeats hit the persistent URL cache
+        content_type = await asyncio.to_thread(get_content_type, url, True)
         return {
             "valid": True,
             "content_type": content_type,
@@ -304,9 +520,17 @@ async def validate_url(url: str):
         }
 
 @app.get("/config")
-async def get_configuration(config: ConfigManager = Depends(get_config)):
+async def get_configuration(request: Request, response: Response,
+                            config: ConfigManager = Depends(get_config)):
     """Get current configuration"""
-    return config.get_all_config()
+    current = config.get_all_config()
+
+    etag = _weak_etag(json.dumps(current, sort_keys=True, default=str))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    return current
 
 @app.put("/config")
 async def update_configuration(
@@ -320,9 +544,9 @@ async def update_configuration(
     return {"message": "Configuration updated"}
 
 @app.post("/maintenance/cleanup")
-async def cleanup_old_jobs(days: int = 30, db: DatabaseManager = Depends(get_db)):
+async def cleanup_old_jobs(days: int = 30, db: AsyncDatabaseManager = Depends(get_db)):
     """Clean up old download jobs and results"""
-    deleted_count = db.cleanup_old_jobs(days)
+    deleted_count = await db.cleanup_old_jobs(days)
     return {"message": f"Cleaned up {deleted_count} old jobs"}
 
 if __name__ == "__main__":
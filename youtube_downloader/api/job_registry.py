@@ -0,0 +1,188 @@
+"""Registry of running download jobs, shared across API workers via Redis"""
+
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from youtube_downloader.models.data_models import DownloadJob
+from youtube_downloader.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class JobRegistry:
+    """Track running jobs for this process and mirror their status to Redis
+
+    Each API worker keeps the DownloadJob objects it is executing in memory.
+    When a Redis URL is configured, job status is also written to
+    ``ytd:job:{id}`` hashes so any worker can report on or cancel a job it
+    does not own. Running jobs are scored by their owner's last heartbeat in
+    a sorted set, so jobs of a crashed worker stop counting once they go
+    stale. Without Redis the registry behaves like a plain dict.
+    """
+
+    KEY_PREFIX = "ytd:job:"
+    ACTIVE_KEY = "ytd:jobs:heartbeat"
+    EVENTS_CHANNEL = "ytd:job-events"
+    STATUS_CACHE_TTL = 0.5
+    # Job hashes outlive a crashed worker by at most this long; every update() refreshes it
+    JOB_TTL = 24 * 3600
+    HEARTBEAT_INTERVAL = 30.0
+    # Jobs whose owner missed this many heartbeats are no longer counted as running
+    STALE_AFTER = 3 * HEARTBEAT_INTERVAL
+
+    # Flag a job cancelled only while its hash exists, so a job that already finished
+    # (and was unregistered) isn't resurrected as an orphan hash
+    _MARK_CANCELLED_LUA = """
+        if redis.call('EXISTS', KEYS[1]) == 0 then
+            return 0
+        end
+        redis.call('HSET', KEYS[1], 'status', 'cancelled')
+        redis.call('PUBLISH', ARGV[1], ARGV[2])
+        return 1
+    """
+
+    def __init__(self, redis_url: Optional[str] = None) -> None:
+        self.redis_url = redis_url
+        self.redis: Optional[redis.Redis] = None
+        self._jobs: Dict[str, DownloadJob] = {}
+        self._status_cache: Dict[str, Tuple[float, Optional[Dict[str, str]]]] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def connect(self) -> None:
+        """Connect to Redis if configured, falling back to process-local tracking"""
+        if not self.redis_url:
+            return
+        try:
+            self.redis = redis.from_url(self.redis_url, decode_responses=True)
+            await self.redis.ping()
+        except Exception as e:
+            logger.warning(f"Job registry Redis unavailable, tracking jobs per process: {e}")
+            self.redis = None
+            return
+        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def close(self) -> None:
+        """Stop heartbeats and close the Redis connection"""
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        if self.redis:
+            await self.redis.close()
+            self.redis = None
+
+    def get_local(self, job_id: str) -> Optional[DownloadJob]:
+        """Get a job executed by this process"""
+        return self._jobs.get(job_id)
+
+    async def register(self, job: DownloadJob) -> None:
+        """Start tracking a job owned by this process"""
+        self._jobs[job.id] = job
+        await self.update(job)
+
+    async def update(self, job: DownloadJob) -> None:
+        """Publish the current status of a job"""
+        self._status_cache.pop(job.id, None)
+        if not self.redis:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hset(self.KEY_PREFIX + job.id, mapping=self._status_fields(job))
+            pipe.expire(self.KEY_PREFIX + job.id, self.JOB_TTL)
+            pipe.zadd(self.ACTIVE_KEY, {job.id: time.time()})
+            pipe.publish(self.EVENTS_CHANNEL, f"{job.id}:{job.status}")
+            await pipe.execute()
+
+    async def unregister(self, job_id: str) -> None:
+        """Stop tracking a job"""
+        self._jobs.pop(job_id, None)
+        self._status_cache.pop(job_id, None)
+        if not self.redis:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.ACTIVE_KEY, job_id)
+            pipe.delete(self.KEY_PREFIX + job_id)
+            await pipe.execute()
+
+    async def mark_cancelled(self, job_id: str) -> bool:
+        """Flag a job owned by another worker as cancelled; False if it is no longer running"""
+        self._status_cache.pop(job_id, None)
+        if not self.redis:
+            return False
+
+        cancelled = await self.redis.eval(
+            self._MARK_CANCELLED_LUA, 1, self.KEY_PREFIX + job_id,
+            self.EVENTS_CHANNEL, f"{job_id}:cancelled"
+        )
+        return bool(cancelled)
+
+    async def get_status(self, job_id: str) -> Optional[Dict[str, str]]:
+        """Get the status fields of a running job, whichever worker owns it"""
+        job = self._jobs.get(job_id)
+        if job:
+            return self._status_fields(job)
+        if not self.redis:
+            return None
+
+        # Sub-second local cache absorbs clients polling the same job
+        now = time.monotonic()
+        cached = self._status_cache.get(job_id)
+        if cached and now - cached[0] < self.STATUS_CACHE_TTL:
+            return cached[1]
+
+        fields = await self.redis.hgetall(self.KEY_PREFIX + job_id) or None
+        self._status_cache[job_id] = (now, fields)
+        return fields
+
+    async def is_cancelled(self, job_id: str) -> bool:
+        """Check whether a job has been cancelled by any worker"""
+        job = self._jobs.get(job_id)
+        if job and job.status == "cancelled":
+            return True
+        if not self.redis:
+            return False
+        return await self.redis.hget(self.KEY_PREFIX + job_id, "status") == "cancelled"
+
+    async def count(self) -> int:
+        """Number of running jobs across all workers"""
+        if not self.redis:
+            return len(self._jobs)
+
+        # Trim jobs left behind by crashed workers before counting
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(self.ACTIVE_KEY, "-inf", time.time() - self.STALE_AFTER)
+            pipe.zcard(self.ACTIVE_KEY)
+            _, active = await pipe.execute()
+        return active
+
+    async def heartbeat(self) -> None:
+        """Mark every job owned by this process as still running"""
+        if not self.redis or not self._jobs:
+            return
+        await self.redis.zadd(self.ACTIVE_KEY, dict.fromkeys(self._jobs, time.time()))
+
+    async def _heartbeat_loop(self) -> None:
+        """Refresh this process's jobs every HEARTBEAT_INTERVAL seconds"""
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.warning(f"Job registry heartbeat failed: {e}")
+
+    @staticmethod
+    def _status_fields(job: DownloadJob) -> Dict[str, str]:
+        """Flatten job status into Redis hash fields"""
+        return {
+            "status": job.status,
+            "created_at": job.created_at.isoformat(),
+            "started_at": job.started_at.isoformat() if job.started_at else "",
+            "completed_at": job.completed_at.isoformat() if job.completed_at else "",
+            "error": job.error or "",
+        }
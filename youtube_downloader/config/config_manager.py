@@ -1,15 +1,39 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 import os
 import json
+import orjson
+from collections import ChainMap
 from pathlib import Path
+from types import MappingProxyType
 from .default_config import DEFAULT_CONFIG, MODERN_YT_DLP_OPTS
 
+# Read-only snapshots of the defaults, built once at import and shared by
+# every ConfigManager as the bottom layer of its ChainMap
+_DEFAULTS = MappingProxyType(dict(DEFAULT_CONFIG))
+_YDL_DEFAULTS = MappingProxyType(dict(MODERN_YT_DLP_OPTS))
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable"""
+    return value.lower() in ('true', '1', 'yes', 'on')
+
+# (environment variable, config key, converter); values that fail to convert are ignored
+_ENV_SPEC: Tuple[Tuple[str, str, Callable[[str], Any]], ...] = (
+    ('YTD_OUTPUT_PATH', 'output_path', str),
+    ('YTD_MAX_WORKERS', 'max_workers', int),
+    ('YTD_AUDIO_ONLY', 'audio_only', _parse_bool),
+    ('YTD_MAX_RETRIES', 'max_retries', int),
+    ('YTD_TIMEOUT', 'download_timeout', int),
+    ('YTD_COOKIES_FILE', 'cookies_file', str),
+    ('YTD_RATE_LIMIT', 'throttled_rate', int),
+    ('YTD_SPONSORBLOCK', 'enable_sponsorblock', _parse_bool),
+)
+
 class ConfigManager:
     """The ACJ's Enterprise-grade configuration manager with validation and environment support"""
 
     def __init__(self, config_file: Optional[str] = None) -> None:
-        self.config: Dict[str, Any] = DEFAULT_CONFIG.copy()
-        self.modern_ydl_opts: Dict[str, Any] = MODERN_YT_DLP_OPTS.copy()
+        self.config: ChainMap = ChainMap({}, _DEFAULTS)
+        self.modern_ydl_opts: ChainMap = ChainMap({}, _YDL_DEFAULTS)
         self.config_file: str = config_file or os.getenv('YTD_CONFIG_FILE', 'download_config.json')
         self._load_from_env()
         self.load_config()
@@ -17,30 +41,14 @@ class ConfigManager:
 
     def _load_from_env(self) -> None:
         """Load configuration from environment variables"""
-        env_mappings = {
-            'YTD_OUTPUT_PATH': 'output_path',
-            'YTD_MAX_WORKERS': 'max_workers',
-            'YTD_AUDIO_ONLY': 'audio_only',
-            'YTD_MAX_RETRIES': 'max_retries',
-            'YTD_TIMEOUT': 'download_timeout',
-            'YTD_COOKIES_FILE': 'cookies_file',
-            'YTD_RATE_LIMIT': 'throttled_rate',
-            'YTD_SPONSORBLOCK': 'enable_sponsorblock',
-        }
-
-        for env_var, config_key in env_mappings.items():
-            value = os.getenv(env_var)
-            if value is not None:
-                # Type conversion
-                if config_key in ['max_workers', 'max_retries', 'download_timeout', 'throttled_rate']:
-                    try:
-                        self.config[config_key] = int(value)
-                    except ValueError:
-                        pass
-                elif config_key in ['audio_only', 'enable_sponsorblock']:
-                    self.config[config_key] = value.lower() in ('true', '1', 'yes', 'on')
-                else:
-                    self.config[config_key] = value
+        for env_var, config_key, convert in _ENV_SPEC:
+            value = os.environ.get(env_var)
+            if value is None:
+                continue
+            try:
+                self.config[config_key] = convert(value)
+            except ValueError:
+                pass
 
     def _validate_config(self) -> None:
         """Validate configuration values"""
@@ -72,11 +80,18 @@ class ConfigManager:
         try:
             config_path = Path(self.config_file)
             config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            config_path.write_bytes(orjson.dumps(dict(self.config), option=orjson.OPT_INDENT_2))
         except IOError as e:
             print(f"Warning: Could not save config file {self.config_file}: {e}")
 
+    def clone_with(self, overrides: Dict[str, Any]) -> 'ConfigManager':
+        """Create a copy of this manager with overrides applied, without env/file I/O"""
+        clone = object.__new__(ConfigManager)
+        clone.config = ChainMap({**self.config.maps[0], **overrides}, _DEFAULTS)
+        clone.modern_ydl_opts = ChainMap(dict(self.modern_ydl_opts.maps[0]), _YDL_DEFAULTS)
+        clone.config_file = self.config_file
+        return clone
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value"""
         return self.config.get(key, default)
@@ -88,7 +103,7 @@ class ConfigManager:
 
     def get_modern_ydl_opts(self) -> Dict[str, Any]:
         """Get modern yt-dlp options"""
-        return self.modern_ydl_opts.copy()
+        return dict(self.modern_ydl_opts)
 
     def update_ydl_opts(self, updates: Dict[str, Any]) -> None:
         """Update yt-dlp options"""
@@ -96,11 +111,11 @@ class ConfigManager:
 
     def get_all_config(self) -> Dict[str, Any]:
         """Get all configuration as dict"""
-        return self.config.copy()
+        return dict(self.config)
 
     def reset_to_defaults(self) -> None:
         """Reset configuration to defaults"""
-        self.config = DEFAULT_CONFIG.copy()
-        self.modern_ydl_opts = MODERN_YT_DLP_OPTS.copy()
+        self.config = ChainMap({}, _DEFAULTS)
+        self.modern_ydl_opts = ChainMap({}, _YDL_DEFAULTS)
         self._load_from_env()
         self._validate_config()
\ No newline at end of file
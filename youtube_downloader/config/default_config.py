@@ -1,6 +1,7 @@
 DEFAULT_CONFIG = {
     'output_path': './downloads',
     'max_workers': 3,
+    'fragment_workers': 8,          # Concurrent DASH/HLS fragment downloads per video
     'batch_size': 10,
     'audio_only': False,
     'max_retries': 15,  # Increased for live streams
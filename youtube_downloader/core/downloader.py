@@ -1,11 +1,17 @@
 from yt_dlp import YoutubeDL
+from yt_dlp.utils import DownloadError
+import asyncio
 import os
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+import importlib.util
 import random
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 from config.config_manager import ConfigManager
 from config.default_config import LIVE_STREAM_OPTS, COOKIE_OPTS
@@ -16,14 +22,97 @@ from utils.auth import setup_youtube_auth
 
 logger = setup_logger(__name__)
 
+# With curl_cffi installed, yt-dlp can use its HTTP/2-capable, browser-impersonating backend
+_IMPERSONATE_TARGET = None
+if importlib.util.find_spec('curl_cffi') is not None:
+    from yt_dlp.networking.impersonate import ImpersonateTarget
+    _IMPERSONATE_TARGET = ImpersonateTarget.from_str('chrome')
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds a server asked us to wait via Retry-After, from any error in the chain"""
+    seen = set()
+    pending = [error]
+    while pending:
+        exc = pending.pop()
+        if exc is None or id(exc) in seen:
+            continue
+        seen.add(id(exc))
+
+        # yt-dlp's networking HTTPError carries .response; urllib's HTTPError has .headers
+        headers = getattr(getattr(exc, 'response', None), 'headers', None) or getattr(exc, 'headers', None)
+        value = headers.get('Retry-After') if headers else None
+        if value:
+            value = value.strip()
+            if value.isdigit():
+                return float(value)
+            try:
+                when = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=timezone.utc)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+        # DownloadError wraps the original exception in exc_info
+        exc_info = getattr(exc, 'exc_info', None)
+        pending.extend((exc.__cause__, exc.__context__, exc_info[1] if exc_info else None))
+    return None
+
+_RETRYABLE_ERRORS = (
+    r'HTTP Error (?:403|429|502|503|504)'    # Forbidden, Too Many Requests, Bad Gateway, Unavailable, Timeout
+    r'|Connection (?:reset|timed out)'
+    r'|Network is unreachable'
+    r'|Temporary failure'
+    r'|unable to download video data'
+    r'|Fragment download failed'
+)
+
 class YouTubeDownloader:
+    MAX_RETRY_DELAY = 300  # 5 minutes max
+    MAX_CONGESTION = 8
+    CONGESTION_BASE_DELAY = 1.0
+
+    _RATE_LIMITED_RE = re.compile(r'HTTP Error (?:403|429)', re.IGNORECASE)
+
+    _RETRYABLE_RE = re.compile(_RETRYABLE_ERRORS, re.IGNORECASE)
+    _RETRYABLE_LIVE_RE = re.compile(
+        _RETRYABLE_ERRORS + r'|Live stream|Stream ended|Fragment unavailable', re.IGNORECASE
+    )
+
     def __init__(self, config: ConfigManager):
         self.config = config
         self.file_manager = FileManager(config)
         self._stop_event = threading.Event()
+        # Congestion level shared by all workers: rises on 403/429, decays on success
+        self._congestion = 0
+        self._congestion_lock = threading.Lock()
+        # Caps concurrent yt-dlp extractions across all pools, including per-playlist entry pools
+        self._extraction_slots = threading.BoundedSemaphore(config.get('max_workers', 3))
+        # Resolved yt-dlp options per (audio_only, is_live), built once per downloader
+        self._opts_cache: Dict[Tuple[bool, bool], Dict] = {}
+        self._opts_lock = threading.Lock()
+        # Per-run settings read once; cookies are resolved lazily since extraction is slow
+        self._use_cookies = config.get('use_cookies', True)
+        self._proxy_url = config.get('proxy_url')
+        self._sponsorblock = config.get('enable_sponsorblock')
+        self._cookie_file: Optional[str] = None
+        self._cookies_resolved = False
 
     def get_modern_ydl_opts(self, audio_only: bool = False, is_live: bool = False) -> Dict:
         """Get modern yt-dlp options with current YouTube workarounds """
+        key = (audio_only, is_live)
+        opts = self._opts_cache.get(key)
+        if opts is None:
+            with self._opts_lock:
+                opts = self._opts_cache.get(key)
+                if opts is None:
+                    opts = self._opts_cache[key] = self._build_ydl_opts(audio_only, is_live)
+
+        # Callers only set top-level keys (outtmpl, progress_hooks), so a shallow copy suffices
+        return dict(opts)
+
+    def _build_ydl_opts(self, audio_only: bool, is_live: bool) -> Dict:
+        """Build yt-dlp options from config (called once per option set)"""
         base_opts = self.config.get_modern_ydl_opts().copy()
 
         # Set output template
@@ -47,6 +136,18 @@ class YouTubeDownloader:
             base_opts['format'] = self.config.get('format_preference')
             base_opts['merge_output_format'] = 'mp4'
 
+        # Fail stalled connections instead of hanging a worker; prefer HTTP/2 when available
+        base_opts['socket_timeout'] = 30
+        if _IMPERSONATE_TARGET is not None:
+            base_opts['impersonate'] = _IMPERSONATE_TARGET
+
+        # Download DASH/HLS fragments in parallel, in YouTube-throttle-sized HTTP chunks
+        base_opts['concurrent_fragment_downloads'] = self.config.get('fragment_workers', 8)
+        base_opts['http_chunk_size'] = 10 * 1024 * 1024
+        # Larger write buffer means fewer syscalls per MB; MP4 fragments concat without remuxing TS
+        base_opts['buffersize'] = 1 << 16
+        base_opts['hls_use_mpegts'] = False
+
         # Live stream configuration with enhanced options
         if is_live:
             live_opts = LIVE_STREAM_OPTS.copy()
@@ -58,30 +159,41 @@ class YouTubeDownloader:
             base_opts.update(live_opts)
 
         # Cookie-based authentication for restricted content
-        if self.config.get('use_cookies', True):
-            try:
-                cookie_file = setup_youtube_auth(self.config)
-                if cookie_file:
-                    base_opts['cookiefile'] = cookie_file
-                    logger.info("YouTube authentication enabled with browser cookies")
-                else:
-                    logger.warning("Cookie authentication setup failed - proceeding without cookies")
-            except Exception as e:
-                logger.warning(f"Failed to setup cookie authentication: {e}")
+        if self._use_cookies:
+            cookie_file = self._resolve_cookie_file()
+            if cookie_file:
+                base_opts['cookiefile'] = cookie_file
 
         # Proxy support for geo-restricted content
-        proxy_url = self.config.get('proxy_url')
-        if proxy_url:
-            base_opts['proxy'] = proxy_url
-            logger.info(f"Using proxy: {proxy_url}")
+        if self._proxy_url:
+            base_opts['proxy'] = self._proxy_url
+            logger.info(f"Using proxy: {self._proxy_url}")
 
         # SponsorBlock integration
-        if self.config.get('enable_sponsorblock'):
+        if self._sponsorblock:
             base_opts['postprocessor_args'] = ['--sponsorblock-mark', 'all']
 
         return base_opts
 
-    def download_single_video(self, url: str, audio_only: Optional[bool] = None) -> Dict:
+    def _resolve_cookie_file(self) -> Optional[str]:
+        """Set up cookie authentication once and remember the resulting cookie file
+
+        Only called while holding _opts_lock, so concurrent workers extract cookies once.
+        """
+        if not self._cookies_resolved:
+            self._cookies_resolved = True
+            try:
+                self._cookie_file = setup_youtube_auth(self.config)
+                if self._cookie_file:
+                    logger.info("YouTube authentication enabled with browser cookies")
+                else:
+                    logger.warning("Cookie authentication setup failed - proceeding without cookies")
+            except Exception as e:
+                logger.warning(f"Failed to setup cookie authentication: {e}")
+        return self._cookie_file
+
+    def download_single_video(self, url: str, audio_only: Optional[bool] = None, *,
+                              content_type: Optional[str] = None, outtmpl: Optional[str] = None) -> Dict:
         """Download a single video or live stream with enhanced error handling"""
         if audio_only is None:
             audio_only = self.config.get('audio_only', False)
@@ -94,16 +206,24 @@ class YouTubeDownloader:
                 'error': 'Download cancelled by user'
             }
 
-        content_type = get_content_type(url)
+        # Callers that already classified the URL pass it in to skip a second lookup
+        if content_type is None:
+            content_type = get_content_type(url)
         is_live = content_type == 'live'
 
         # Implement retry logic for live streams and 403 errors
         max_retries = self.config.get('max_retries', 10)
         retry_count = 0
+        retry_delay: Optional[float] = None
 
         while retry_count <= max_retries:
             try:
                 ydl_opts = self.get_modern_ydl_opts(audio_only, is_live)
+                # ignoreerrors would turn a 403/429 into a None result; let it raise so the
+                # retry, Retry-After and congestion handling below sees it
+                ydl_opts['ignoreerrors'] = False
+                if outtmpl:
+                    ydl_opts['outtmpl'] = outtmpl
 
                 # Add progress hooks
                 if hasattr(self, 'progress_hook'):
@@ -111,16 +231,20 @@ class YouTubeDownloader:
 
                 logger.info(f"Downloading {content_type}: {url} (attempt {retry_count + 1}/{max_retries + 1})")
 
-                # Check for shutdown before starting download
-                if self._stop_event.is_set():
+                # Admission control: while YouTube is rate-limiting, every worker holds back.
+                # wait(0) is a plain shutdown check when there is no congestion
+                if self._stop_event.wait(timeout=self._admission_delay()):
                     return {
                         'success': False,
                         'url': url,
                         'error': 'Download cancelled by user'
                     }
 
-                with YoutubeDL(ydl_opts) as ydl:
+                with self._extraction_slots, YoutubeDL(ydl_opts) as ydl:
                     info = ydl.extract_info(url, download=True)
+                    if info is None:
+                        raise DownloadError(f'No information extracted for {url}')
+                    self._adjust_congestion(-1)
 
                     # Check if shutdown was requested during download
                     if self._stop_event.is_set():
@@ -135,7 +259,8 @@ class YouTubeDownloader:
                         'url': url,
                         'title': info.get('title', 'Unknown'),
                         'duration': info.get('duration', 0),
-                        'is_live': is_live,
+                        # yt-dlp knows for sure; the URL-based classification may miss live watch URLs
+                        'is_live': is_live or bool(info.get('is_live')),
                         'was_live': info.get('was_live', False)
                     }
 
@@ -143,6 +268,9 @@ class YouTubeDownloader:
                 error_msg = str(e)
                 logger.warning(f"Download attempt {retry_count + 1} failed for {url}: {error_msg}")
 
+                if self._RATE_LIMITED_RE.search(error_msg):
+                    self._adjust_congestion(1)
+
                 # Check if this is a retryable error
                 is_retryable = self._is_retryable_error(error_msg, is_live)
 
@@ -154,9 +282,13 @@ class YouTubeDownloader:
                         'error': error_msg
                     }
 
-                # Exponential backoff for retries
-                retry_delay = self._calculate_retry_delay(retry_count, is_live)
-                logger.info(f"Retrying in {retry_delay} seconds...")
+                # Honour the server's Retry-After, else jittered exponential backoff
+                retry_after = _retry_after(e)
+                if retry_after is not None:
+                    retry_delay = min(retry_after, self.MAX_RETRY_DELAY)
+                else:
+                    retry_delay = self._calculate_retry_delay(retry_delay, is_live)
+                logger.info(f"Retrying in {retry_delay:.1f} seconds...")
 
                 if self._stop_event.wait(timeout=retry_delay):
                     # Shutdown was requested during wait
@@ -189,39 +321,72 @@ class YouTubeDownloader:
             }
 
         try:
+            # Resolve entry URLs only; the entries themselves are downloaded in parallel below
             ydl_opts = self.get_modern_ydl_opts(audio_only)
-            ydl_opts['outtmpl'] = self.file_manager.get_playlist_output_template(audio_only)
+            ydl_opts['extract_flat'] = 'in_playlist'
 
             logger.info(f"Downloading playlist: {url}")
 
-            # Check for shutdown before starting
-            if self._stop_event.is_set():
+            with self._extraction_slots, YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+
+            if not info:
                 return {
                     'success': False,
                     'url': url,
-                    'error': 'Download cancelled by user'
+                    'error': 'Could not extract playlist'
                 }
 
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
+            # Walk the entries once, keeping only their URLs
+            entry_urls = []
+            for entry in info.get('entries') or []:
+                entry_url = entry and (entry.get('url') or entry.get('webpage_url'))
+                if entry_url:
+                    entry_urls.append(entry_url)
+
+            # Release the metadata before the (long) download phase
+            title = info.get('title')
+            playlist_id = info.get('id')
+            info.clear()
+            del info
+
+            # Entries are downloaded as single videos, so fill in the playlist title ourselves
+            playlist_title = self.file_manager.sanitize_filename(title or playlist_id or 'playlist')
+            outtmpl = self.file_manager.get_playlist_output_template(audio_only).replace(
+                '%(playlist_title)s', playlist_title.replace('%', '%%')
+            )
 
-                # Check if shutdown was requested during download
-                if self._stop_event.is_set():
-                    return {
-                        'success': False,
-                        'url': url,
-                        'error': 'Download interrupted by user'
-                    }
+            results = self._download_entries(entry_urls, audio_only, outtmpl)
+
+            # Check if shutdown was requested during download
+            if self._stop_event.is_set():
+                return {
+                    'success': False,
+                    'url': url,
+                    'error': 'Download interrupted by user'
+                }
 
+            downloaded_entries = sum(1 for result in results if result['success'])
+            if entry_urls and not downloaded_entries:
                 return {
-                    'success': True,
+                    'success': False,
                     'url': url,
                     'type': 'playlist',
-                    'title': info.get('title', 'Unknown Playlist'),
-                    'entry_count': len(info.get('entries', [])),
-                    'downloaded_entries': sum(1 for e in info.get('entries', []) if e.get('requested_downloads'))
+                    'title': title or 'Unknown Playlist',
+                    'entry_count': len(entry_urls),
+                    'downloaded_entries': 0,
+                    'error': f'None of the {len(entry_urls)} playlist entries could be downloaded'
                 }
 
+            return {
+                'success': True,
+                'url': url,
+                'type': 'playlist',
+                'title': title or 'Unknown Playlist',
+                'entry_count': len(entry_urls),
+                'downloaded_entries': downloaded_entries
+            }
+
         except Exception as e:
             logger.error(f"Playlist download failed for {url}: {str(e)}")
             return {
@@ -230,17 +395,41 @@ class YouTubeDownloader:
                 'error': str(e)
             }
 
-    def download_multiple_urls(self, urls: List[str], audio_only: Optional[bool] = None) -> List[Dict]:
-        """Download multiple URLs with parallel processing"""
+    def _download_entries(self, urls: List[str], audio_only: bool, outtmpl: str) -> List[Dict]:
+        """Download playlist entries in parallel
+
+        Entries share the downloader's extraction slots with every other download,
+        so playlists running side by side still stay within max_workers in total.
+        """
+        if not urls:
+            return []
+
+        max_workers = min(self.config.get('max_workers', 3), len(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda entry_url: self.download_single_video(entry_url, audio_only, content_type='video', outtmpl=outtmpl),
+                urls
+            ))
+
+    def download_multiple_urls(self, urls: List[str], audio_only: Optional[bool] = None,
+                               callback: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Download multiple URLs with parallel processing
+
+        With a callback, each result is handed to it as soon as it completes
+        and is not kept, so the returned list is empty.
+        """
         if audio_only is None:
             audio_only = self.config.get('audio_only', False)
 
         max_workers = min(self.config.get('max_workers', 3), len(urls))
         results = []
 
+        # Classify everything up front (URL patterns only, no network) so workers only download
+        content_types = {url: get_content_type(url) for url in urls}
+
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_url = {
-                executor.submit(self.download_single_item, url, audio_only): url
+                executor.submit(self.download_single_item, url, audio_only, content_types[url]): url
                 for url in urls
             }
 
@@ -254,72 +443,104 @@ class YouTubeDownloader:
                             f.cancel()
                     break
 
-                url = future_to_url[future]
+                # Drop our reference so finished futures (and their results) can be freed
+                url = future_to_url.pop(future)
                 try:
                     result = future.result()
-                    results.append(result)
                 except Exception as e:
                     logger.error(f"Thread execution failed for {url}: {str(e)}")
-                    results.append({
+                    result = {
                         'success': False,
                         'url': url,
                         'error': str(e)
-                    })
+                    }
+
+                if callback:
+                    callback(result)
+                else:
+                    results.append(result)
 
         return results
 
-    def download_single_item(self, url: str, audio_only: bool) -> Dict:
+    async def download_multiple_urls_async(self, urls: List[str], audio_only: Optional[bool] = None,
+                                           executor: Optional[Executor] = None) -> List[Dict]:
+        """Download multiple URLs from the event loop, at most max_workers at a time"""
+        if audio_only is None:
+            audio_only = self.config.get('audio_only', False)
+
+        semaphore = asyncio.Semaphore(self.config.get('max_workers', 3))
+        content_types = {url: get_content_type(url) for url in urls}
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(self._download_bounded(semaphore, url, audio_only, content_types[url], executor))
+                for url in urls
+            ]
+
+        return [task.result() for task in tasks]
+
+    async def _download_bounded(self, semaphore: asyncio.Semaphore, url: str, audio_only: bool,
+                                content_type: str, executor: Optional[Executor]) -> Dict:
+        """Download one item in a worker thread while holding a semaphore slot"""
+        async with semaphore:
+            if self._stop_event.is_set():
+                return {
+                    'success': False,
+                    'url': url,
+                    'error': 'Download cancelled by user'
+                }
+
+            # Retries and 429 backoff happen inside download_single_item, so they hold the slot
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, self.download_single_item, url, audio_only, content_type
+                )
+            except Exception as e:
+                logger.error(f"Download task failed for {url}: {str(e)}")
+                return {
+                    'success': False,
+                    'url': url,
+                    'error': str(e)
+                }
+
+    def download_single_item(self, url: str, audio_only: bool, content_type: Optional[str] = None) -> Dict:
         """Download a single item (video, playlist, or live stream)"""
-        content_type = get_content_type(url)
+        if content_type is None:
+            content_type = get_content_type(url)
 
-        if content_type == 'playlist':
+        # Channels are playlists of uploads as far as yt-dlp is concerned
+        if content_type in ('playlist', 'channel'):
             return self.download_playlist(url, audio_only)
         else:
-            return self.download_single_video(url, audio_only)
+            return self.download_single_video(url, audio_only, content_type=content_type)
 
     def _is_retryable_error(self, error_msg: str, is_live: bool) -> bool:
         """Determine if an error is retryable"""
-        retryable_patterns = [
-            'HTTP Error 403',
-            'HTTP Error 429',  # Too Many Requests
-            'HTTP Error 502',  # Bad Gateway
-            'HTTP Error 503',  # Service Unavailable
-            'HTTP Error 504',  # Gateway Timeout
-            'Connection reset',
-            'Connection timed out',
-            'Network is unreachable',
-            'Temporary failure',
-            'unable to download video data',
-            'Fragment download failed',
-        ]
-
         # For live streams, be more aggressive with retries
-        if is_live:
-            retryable_patterns.extend([
-                'Live stream',
-                'Stream ended',
-                'Fragment unavailable',
-            ])
-
-        error_lower = error_msg.lower()
-        return any(pattern.lower() in error_lower for pattern in retryable_patterns)
-
-    def _calculate_retry_delay(self, retry_count: int, is_live: bool) -> float:
-        """Calculate retry delay with exponential backoff"""
+        pattern = self._RETRYABLE_LIVE_RE if is_live else self._RETRYABLE_RE
+        return pattern.search(error_msg) is not None
+
+    def _admission_delay(self) -> float:
+        """Random delay before starting a download, scaled by the shared congestion level"""
+        congestion = self._congestion
+        if not congestion:
+            return 0.0
+        return random.uniform(0, self.CONGESTION_BASE_DELAY * 2 ** congestion)
+
+    def _adjust_congestion(self, delta: int) -> None:
+        """Raise or lower the shared congestion level"""
+        with self._congestion_lock:
+            self._congestion = min(self.MAX_CONGESTION, max(0, self._congestion + delta))
+
+    def _calculate_retry_delay(self, prev_delay: Optional[float], is_live: bool) -> float:
+        """Calculate retry delay with decorrelated jitter backoff"""
         base_delay = 5 if is_live else 2
-        max_delay = 300  # 5 minutes max
-
-        # Exponential backoff: base_delay * (2 ^ retry_count)
-        delay = base_delay * (2 ** retry_count)
-
-        # Add jitter to avoid thundering herd
-        jitter = random.uniform(0.5, 1.5)
-        delay *= jitter
-
-        # Cap at maximum delay
-        delay = min(delay, max_delay)
+        max_delay = self.MAX_RETRY_DELAY
 
-        return delay
+        # Decorrelated jitter: draw from [base, 3 * previous delay]. Delays keep their
+        # spread even near the cap, so parallel workers hit by the same 429 don't retry in lockstep
+        prev_delay = prev_delay or base_delay
+        return min(max_delay, random.uniform(base_delay, prev_delay * 3))
 
     def stop_all_downloads(self):
         """Stop all ongoing downloads"""
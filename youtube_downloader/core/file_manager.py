@@ -1,11 +1,17 @@
 import os
-from typing import Optional
+from typing import Optional, Set
 from config.config_manager import ConfigManager
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Characters not allowed in filenames on common filesystems, all mapped to '_'
+_SANITIZE_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
 class FileManager:
+    # Output directories already ensured by this process; skips a syscall per instance
+    _ensured_paths: Set[str] = set()
+
     def __init__(self, config: ConfigManager):
         self.config = config
         self.ensure_output_directory()
@@ -13,9 +19,16 @@ class FileManager:
     def ensure_output_directory(self):
         """Ensure the output directory exists"""
         output_path = self.config.get('output_path')
-        if not os.path.exists(output_path):
-            os.makedirs(output_path, exist_ok=True)
+        if output_path in FileManager._ensured_paths:
+            return
+
+        # makedirs is race-free on its own; FileExistsError just means there's nothing to do
+        try:
+            os.makedirs(output_path)
             logger.info(f"Created output directory: {output_path}")
+        except FileExistsError:
+            pass
+        FileManager._ensured_paths.add(output_path)
 
     def get_output_template(self, audio_only: bool = False) -> str:
         """Get output template for files"""
@@ -43,19 +56,8 @@ class FileManager:
 
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize filename for filesystem compatibility"""
-        # Remove or replace invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-
-        # Remove leading/trailing dots and spaces
-        filename = filename.strip('. ')
-
-        # Limit length
-        if len(filename) > 255:
-            filename = filename[:255]
-
-        return filename
+        # Replace invalid characters in one pass, trim leading/trailing dots and spaces, limit length
+        return filename.translate(_SANITIZE_TABLE).strip('. ')[:255]
 
     def get_file_info(self, filepath: str) -> dict:
         """Get information about a downloaded file"""
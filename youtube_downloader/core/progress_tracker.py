@@ -1,16 +1,24 @@
 from typing import Callable, Dict, Any
 import logging
+import os
+import time
 from tqdm import tqdm
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_basename = os.path.basename
+
+# Minimum seconds between progress bar postfix refreshes
+POSTFIX_INTERVAL = 0.1
+
 class ProgressTracker:
     def __init__(self, total_items: int = 0, description: str = "Downloading"):
         self.total_items = total_items
         self.description = description
         self.progress_bar = None
         self.current_item = 0
+        self._last_postfix = 0.0
 
     def create_progress_bar(self, total: int = None):
         """Create a progress bar for downloads"""
@@ -34,12 +42,15 @@ class ProgressTracker:
                 downloaded_bytes = d.get('downloaded_bytes', 0)
                 total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
 
-                if total_bytes > 0:
+                # yt-dlp calls this hundreds of times per file; refresh at most ~10 Hz
+                now = time.monotonic()
+                if total_bytes > 0 and now - self._last_postfix >= POSTFIX_INTERVAL:
+                    self._last_postfix = now
                     percentage = (downloaded_bytes / total_bytes) * 100
                     self.progress_bar.set_postfix({
                         'speed': d.get('speed', 0),
                         'eta': d.get('eta', 0),
-                        'file': d.get('filename', '').split('/')[-1][:30]
+                        'file': _basename(d.get('filename', ''))[:30]
                     })
                     # Note: tqdm doesn't directly support byte-level progress easily
                     # This is a simplified version
@@ -1,15 +1,40 @@
-from yt_dlp import YoutubeDL
 from urllib.parse import urlparse, parse_qs
 from functools import lru_cache
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List
 import re
 
-@lru_cache(maxsize=128)
-def get_url_info(url: str) -> Tuple[str, Dict]:
+from utils.url_cache import UrlCache
+
+_YT_HOST = r'(?:www\.)?(?:youtube\.com|youtu\.be)/'
+
+# Compiled once at import; every other supported form is a prefix match of this
+_YT_URL_RE = re.compile(r'^(?:https?://)?' + _YT_HOST, re.IGNORECASE)
+
+# Tokenizes and classifies pasted input in one scan: each comma/whitespace-separated token is a
+# YouTube URL, some other absolute URL (scheme://host...), or junk that is silently dropped
+_URL_SCAN_RE = re.compile(
+    r'(?P<youtube>https?://' + _YT_HOST + r'[^,\s]*)'
+    r'|(?P<other>[a-z][a-z0-9+.-]*://[^/?#,\s]+[^,\s]*)'
+    r'|[^,\s]+',
+    re.IGNORECASE
+)
+
+# Fallback classification in one scan; when several markers appear, the earlier type wins
+_URL_CLASSIFY_RE = re.compile(
+    r'(?P<shorts>/shorts/)|(?P<live>/live/)|(?P<playlist>list=)|(?P<channel>/@|/channel/|/c/)',
+    re.IGNORECASE
+)
+_URL_TYPE_PRIORITY = ('shorts', 'live', 'playlist', 'channel')
+
+def _get_url_info_network(url: str) -> Tuple[str, Dict]:
     """
-    Get URL information with caching and modern YouTube URL support
+    Get URL information from YouTube with modern YouTube URL support
+    Uncached; get_content_type keeps successful probes in the UrlCache
     Returns 'video', 'playlist', 'channel', 'live', or 'shorts'
     """
+    # Deferred so URL validation and pattern classification don't pay for loading yt-dlp
+    from yt_dlp import YoutubeDL
+
     try:
         ydl_opts = {
             'quiet': True,
@@ -54,35 +79,54 @@ def _is_shorts(url: str) -> bool:
     """Check if URL is YouTube Shorts"""
     return '/shorts/' in url.lower()
 
+@lru_cache(maxsize=1)
+def _get_url_cache() -> UrlCache:
+    """Persistent cache of probe results, created on the first probe"""
+    return UrlCache()
+
+@lru_cache(maxsize=4096)
 def _fallback_url_detection(url: str) -> str:
     """Fallback URL detection when yt-dlp fails"""
-    url_lower = url.lower()
-
-    if '/shorts/' in url_lower:
-        return 'shorts'
-    elif '/live/' in url_lower:
-        return 'live'
-    elif 'list=' in url_lower:
-        return 'playlist'
-    elif '/@' in url_lower or '/channel/' in url_lower or '/c/' in url_lower:
-        return 'channel'
-    else:
+    found = {match.lastgroup for match in _URL_CLASSIFY_RE.finditer(url)}
+    if not found:
         return 'video'
+    return min(found, key=_URL_TYPE_PRIORITY.index)
 
-def get_content_type(url: str) -> str:
-    """Get content type of YouTube URL"""
-    content_type, _ = get_url_info(url)
+def get_content_type(url: str, probe: bool = False) -> str:
+    """Get content type of YouTube URL
+
+    Classifies from the URL alone, which covers all download routing; pass
+    probe=True to ask YouTube (one network round-trip, e.g. to spot a live
+    stream behind a plain watch URL). Probe results are kept in the
+    persistent UrlCache, so they honour its TTL across restarts.
+    """
+    if not probe:
+        return _fallback_url_detection(url)
+
+    url_cache = _get_url_cache()
+    cached = url_cache.get(url)
+    if cached:
+        return cached
+
+    content_type, info = _get_url_info_network(url)
+    # Only persist real probe results, not the fallback used when the probe failed
+    if info:
+        url_cache.set(url, content_type)
     return content_type
 
+@lru_cache(maxsize=4096)
 def validate_youtube_url(url: str) -> bool:
     """Validate if URL is a supported YouTube URL"""
-    patterns = [
-        r'^(https?://)?(www\.)?(youtube\.com|youtu\.be)/',
-        r'^(https?://)?(www\.)?youtube\.com/watch\?v=',
-        r'^(https?://)?(www\.)?youtube\.com/playlist\?list=',
-        r'^(https?://)?(www\.)?youtube\.com/live/',
-        r'^(https?://)?(www\.)?youtube\.com/shorts/',
-        r'^(https?://)?(www\.)?youtu\.be/',
-    ]
-
-    return any(re.match(pattern, url, re.IGNORECASE) for pattern in patterns)
\ No newline at end of file
+    return _YT_URL_RE.match(url) is not None
+
+def scan_urls(url_input: str) -> Tuple[List[str], List[str]]:
+    """Split pasted input into (YouTube URLs, other URLs) in a single regex pass"""
+    youtube_urls: List[str] = []
+    other_urls: List[str] = []
+    for match in _URL_SCAN_RE.finditer(url_input):
+        kind = match.lastgroup
+        if kind == 'youtube':
+            youtube_urls.append(match[0])
+        elif kind == 'other':
+            other_urls.append(match[0])
+    return youtube_urls, other_urls
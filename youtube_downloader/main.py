@@ -1,25 +1,31 @@
 #!/usr/bin/env python3
 import sys
 import os
+import select
 import signal
 import threading
-import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from config.config_manager import ConfigManager
-from core.downloader import YouTubeDownloader
-from core.url_handler import validate_youtube_url, get_content_type
-from utils.helpers import parse_multiple_urls, print_download_summary
+from core.url_handler import scan_urls, get_content_type
+from utils.helpers import print_download_result, print_download_totals
 from utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from core.downloader import YouTubeDownloader
+
 logger = setup_logger(__name__)
 
 # Global variables for graceful shutdown
 shutdown_event = threading.Event()
-active_downloader: Optional[YouTubeDownloader] = None
+# Set on shutdown signals and when the download finishes; the main thread sleeps on it
+wakeup_event = threading.Event()
+# Self-pipe (read, write) the main thread selects on; signals write to it via set_wakeup_fd
+wakeup_pipe: Optional[Tuple[int, int]] = None
+active_downloader: Optional['YouTubeDownloader'] = None
 shutdown_in_progress = False
 
 def signal_handler(signum, frame):
@@ -36,6 +42,7 @@ def signal_handler(signum, frame):
 
     # Set shutdown event to signal running operations
     shutdown_event.set()
+    wakeup_event.set()
 
     # Stop active downloader if it exists
     if active_downloader:
@@ -52,6 +59,43 @@ def setup_signal_handlers():
     """Setup signal handlers for graceful shutdown"""
     signal.signal(signal.SIGINT, signal_handler)   # Ctrl+C
     signal.signal(signal.SIGTERM, signal_handler)  # Termination signal
+    setup_wakeup_pipe()
+
+def setup_wakeup_pipe():
+    """Have signals wake the main thread through a self-pipe (POSIX only)"""
+    global wakeup_pipe
+
+    # select() only works on sockets on Windows; wakeup_event is used there instead
+    if os.name == 'nt' or wakeup_pipe is not None:
+        return
+
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    os.set_blocking(write_fd, False)
+    signal.set_wakeup_fd(write_fd)
+    wakeup_pipe = (read_fd, write_fd)
+
+def notify_main_thread():
+    """Wake the main thread from a worker thread"""
+    wakeup_event.set()
+    if wakeup_pipe:
+        try:
+            os.write(wakeup_pipe[1], b'\0')
+        except BlockingIOError:
+            pass  # Pipe full: the main thread has wakeups pending anyway
+
+def wait_for_wakeup():
+    """Block until a signal arrives or a worker calls notify_main_thread"""
+    if wakeup_pipe is None:
+        wakeup_event.wait(timeout=0.5)
+        return
+
+    select.select([wakeup_pipe[0]], [], [])
+    try:
+        while os.read(wakeup_pipe[0], 512):
+            pass
+    except BlockingIOError:
+        pass
 
 def main():
     """Main CLI entry point"""
@@ -77,32 +121,29 @@ def main():
     urls_input = input("Enter YouTube URL(s): ").strip()
 
     if not urls_input:
-        print("📝 Multi-line mode: Enter one URL per line (empty line to finish):")
-        urls_list = []
-        while True:
-            line = input().strip()
-            if not line:
+        print("📝 Multi-line mode: Enter one URL per line (empty line or EOF to finish):")
+        # Read raw lines straight off stdin (no per-line prompt/flush) and keep their newlines,
+        # which scan_urls already treats as separators; later prompts still read what follows
+        lines = []
+        for line in iter(sys.stdin.readline, ''):
+            if line.isspace():
                 break
-            urls_list.append(line)
-        urls_input = '\n'.join(urls_list)
+            lines.append(line)
+        urls_input = ''.join(lines).strip()
 
     if not urls_input:
         print("❌ No URLs provided. Exiting.")
         return
 
-    urls = parse_multiple_urls(urls_input)
+    # Tokenize and validate in one pass over the pasted text
+    valid_urls, invalid_urls = scan_urls(urls_input)
 
-    if not urls:
+    if not valid_urls and not invalid_urls:
         print("❌ No valid YouTube URLs found.")
         return
 
-    # Validate URLs
-    valid_urls = []
-    for url in urls:
-        if validate_youtube_url(url):
-            valid_urls.append(url)
-        else:
-            print(f"⚠️  Skipping invalid URL: {url}")
+    for url in invalid_urls:
+        print(f"⚠️  Skipping invalid URL: {url}")
 
     if not valid_urls:
         print("❌ No valid YouTube URLs to download.")
@@ -118,7 +159,7 @@ def main():
         config.set('audio_only', True)
 
     # Live stream specific options
-    has_live_streams = any(get_content_type(url) == 'live' for url in urls)
+    has_live_streams = any(get_content_type(url) == 'live' for url in valid_urls)
     if has_live_streams:
         print("\n📺 Live stream(s) detected!")
         use_cookies = input("Use browser cookies for authentication? (Y/n): ").strip().lower()
@@ -138,6 +179,9 @@ def main():
             if proxy_url:
                 config.set('proxy_url', proxy_url)
 
+    # Imported only now: yt-dlp takes most of a second to load, so the prompts appear first
+    from core.downloader import YouTubeDownloader
+
     # Initialize downloader and track it globally for shutdown
     downloader = YouTubeDownloader(config)
     active_downloader = downloader
@@ -148,14 +192,26 @@ def main():
 
     # Start download in a separate thread to keep main thread responsive
     from concurrent.futures import ThreadPoolExecutor, Future
-    import time
 
     download_future: Optional[Future] = None
 
+    # Results are reported as they finish; only the tallies are kept for the summary
+    successful_count = 0
+    failed_results = []
+
+    def on_result(result):
+        """Print and tally a finished download"""
+        nonlocal successful_count
+        print_download_result(result)
+        if result.get('success', False):
+            successful_count += 1
+        else:
+            failed_results.append(result)
+
     def run_download():
         """Run download in separate thread"""
         try:
-            return downloader.download_multiple_urls(valid_urls, audio_only)
+            return downloader.download_multiple_urls(valid_urls, audio_only, callback=on_result)
         except Exception as e:
             logger.error(f"Download failed: {e}")
             raise
@@ -163,8 +219,9 @@ def main():
     try:
         with ThreadPoolExecutor(max_workers=1) as executor:
             download_future = executor.submit(run_download)
+            download_future.add_done_callback(lambda _: notify_main_thread())
 
-            # Monitor the download while keeping main thread responsive
+            # Sleep until the download finishes or a shutdown signal arrives
             while not download_future.done():
                 if shutdown_event.is_set():
                     print("\n🛑 Shutdown requested. Cancelling download...")
@@ -176,16 +233,15 @@ def main():
                         pass
                     break
 
-                # Small sleep to prevent busy waiting
-                time.sleep(0.1)
+                wait_for_wakeup()
 
             # Get results if download completed
             if not download_future.cancelled():
-                results = download_future.result()
+                download_future.result()
                 # Clear active downloader reference
                 active_downloader = None
                 # Print summary
-                print_download_summary(results, config.get('output_path'))
+                print_download_totals(successful_count, failed_results, config.get('output_path'))
             else:
                 print("\n❌ Download was cancelled")
                 active_downloader = None
@@ -3,7 +3,9 @@ from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from pathlib import Path
 
-@dataclass
+# Models use slots=True: results are created one per URL, and slots drop the per-instance __dict__
+
+@dataclass(slots=True)
 class DownloadResult:
     """Result of a download operation"""
     success: bool
@@ -22,7 +24,7 @@ class DownloadResult:
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
-@dataclass
+@dataclass(slots=True)
 class PlaylistInfo:
     """Information about a playlist"""
     url: str
@@ -32,7 +34,7 @@ class PlaylistInfo:
     uploader: Optional[str] = None
     description: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class VideoInfo:
     """Information about a video"""
     url: str
@@ -45,7 +47,7 @@ class VideoInfo:
     description: Optional[str] = None
     tags: Optional[List[str]] = None
 
-@dataclass
+@dataclass(slots=True)
 class DownloadConfig:
     """Configuration for downloads"""
     output_path: Path
@@ -58,7 +60,7 @@ class DownloadConfig:
     timeout: int = 3600
     rate_limit: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class DownloadJob:
     """Represents a download job"""
     id: str
@@ -71,7 +73,7 @@ class DownloadJob:
     results: List[DownloadResult] = field(default_factory=list)
     error: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class SystemHealth:
     """System health status"""
     status: str  # healthy, degraded, unhealthy
@@ -82,7 +84,7 @@ class SystemHealth:
     total_downloads: int = 0
     disk_usage: Optional[Dict[str, Any]] = None
 
-@dataclass
+@dataclass(slots=True)
 class DownloadMetrics:
     """Download performance metrics"""
     total_downloads: int = 0
@@ -1,24 +1,59 @@
 """Database models and operations for enterprise-grade download tracking"""
 
+import asyncio
 import sqlite3
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+import threading
+import weakref
+from typing import List, Optional, Dict, Any, Union
+from datetime import datetime, timedelta
 from pathlib import Path
-import json
+import orjson
 from contextlib import contextmanager
-from .data_models import DownloadResult, DownloadJob, DownloadMetrics
+from dataclasses import fields, is_dataclass
+from .data_models import DownloadResult, DownloadJob, DownloadMetrics, DownloadConfig
+
+def _dumps(value: Any) -> str:
+    """Serialize a JSON column value"""
+    # Stored as TEXT (not orjson's bytes) so columns stay consistent with existing rows
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _close_connections(connections: List[sqlite3.Connection]) -> None:
+    """Close every connection a DatabaseManager opened"""
+    for conn in connections:
+        conn.close()
+    connections.clear()
 
 class DatabaseManager:
     """SQLite database manager for download tracking and analytics"""
 
     def __init__(self, db_path: str = "downloads.db") -> None:
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # SQLite URI filenames (e.g. "file:name?mode=memory&cache=shared") are passed through as-is
+        self._is_uri = str(db_path).startswith('file:')
+        self._keepalive: Optional[sqlite3.Connection] = None
+        self.db_path: Union[Path, str]
+
+        # One long-lived connection per thread; closed on close(), GC, or interpreter exit
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _close_connections, self._connections)
+
+        if self._is_uri:
+            self.db_path = str(db_path)
+            # A shared-cache in-memory database only lives while a connection is open
+            self._keepalive = sqlite3.connect(self.db_path, uri=True, check_same_thread=False)
+            self._connections.append(self._keepalive)
+        else:
+            self.db_path = Path(db_path)
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
 
     def _init_db(self) -> None:
         """Initialize database tables"""
         with self._get_connection() as conn:
+            # WAL keeps readers unblocked during writes and makes each commit a cheap append
+            conn.execute('PRAGMA journal_mode=WAL')
+
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS download_jobs (
                     id TEXT PRIMARY KEY,
@@ -64,6 +99,22 @@ class DatabaseManager:
                 )
             ''')
 
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_download_jobs_status_created
+                ON download_jobs (status, created_at DESC)
+            ''')
+
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_download_results_job_id
+                ON download_results (job_id)
+            ''')
+
+            # Unfiltered listing and cleanup_old_jobs range-scan on created_at alone
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_download_jobs_created_at
+                ON download_jobs (created_at)
+            ''')
+
             # Insert initial metrics if not exists
             conn.execute('''
                 INSERT OR IGNORE INTO download_metrics (id, last_updated)
@@ -72,67 +123,144 @@ class DatabaseManager:
 
             conn.commit()
 
+    # Per-connection settings (journal_mode=WAL is persistent and set once in _init_db)
+    _CONNECTION_PRAGMAS = (
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA cache_size=-65536',      # 64 MiB page cache
+        'PRAGMA mmap_size=268435456',    # 256 MiB memory-mapped reads
+        'PRAGMA busy_timeout=5000',
+        # Commits under synchronous=NORMAL don't fsync; the checkpoint does, inline in
+        # whichever commit crosses the threshold, so batch more pages per checkpoint
+        'PRAGMA wal_autocheckpoint=4000',
+        'PRAGMA journal_size_limit=67108864',  # truncate the WAL back to 64 MiB after checkpoints
+    )
+
+    _STATEMENT_CACHE_SIZE = 256
+
     @contextmanager
     def _get_connection(self):
-        """Get database connection with proper cleanup"""
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
         try:
             yield conn
-        finally:
-            conn.close()
+        except BaseException:
+            # The connection outlives this call; don't leave a half-done transaction on it
+            conn.rollback()
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open and configure a new connection"""
+        # The connection's LRU of prepared statements is keyed by SQL text, so the class-level
+        # *_SQL constants are parsed once per thread; size it well above the distinct statements
+        conn = sqlite3.connect(
+            self.db_path, uri=self._is_uri, check_same_thread=False,
+            cached_statements=self._STATEMENT_CACHE_SIZE
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in self._CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close all connections (an in-memory database is discarded)"""
+        with self._connections_lock:
+            self._finalizer()
+        self._local = threading.local()
+        self._keepalive = None
+
+    _UPSERT_JOB_SQL = '''
+        INSERT OR REPLACE INTO download_jobs
+        (id, urls, config, status, created_at, started_at, completed_at, error)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
 
     def save_download_job(self, job: DownloadJob) -> None:
         """Save a download job to database"""
         with self._get_connection() as conn:
-            # Convert config to dict and handle Path objects
-            config_dict = job.config.__dict__ if hasattr(job.config, '__dict__') else job.config
-            if hasattr(config_dict, 'get') and 'output_path' in config_dict:
-                # Convert Path objects to strings
-                config_dict = dict(config_dict)
-                if hasattr(config_dict['output_path'], '__str__'):
-                    config_dict['output_path'] = str(config_dict['output_path'])
+            conn.execute(self._UPSERT_JOB_SQL, self._job_params(job))
+            conn.commit()
 
-            conn.execute('''
-                INSERT OR REPLACE INTO download_jobs
-                (id, urls, config, status, created_at, started_at, completed_at, error)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job.id,
-                json.dumps(job.urls),
-                json.dumps(config_dict),
-                job.status,
-                job.created_at,
-                job.started_at,
-                job.completed_at,
-                job.error
-            ))
+    def save_download_jobs(self, jobs: List[DownloadJob]) -> None:
+        """Save a batch of download jobs in a single transaction"""
+        with self._get_connection() as conn:
+            conn.executemany(self._UPSERT_JOB_SQL, [self._job_params(job) for job in jobs])
             conn.commit()
 
+    @staticmethod
+    def _job_params(job: DownloadJob) -> tuple:
+        """Build the INSERT parameters for a download job"""
+        # Convert config to dict and handle Path objects
+        # (a shallow field copy: slotted dataclasses have no __dict__, and asdict would deep-copy)
+        if is_dataclass(job.config):
+            config_dict = {f.name: getattr(job.config, f.name) for f in fields(job.config)}
+        else:
+            config_dict = job.config
+        if hasattr(config_dict, 'get') and 'output_path' in config_dict:
+            # Convert Path objects to strings
+            config_dict = dict(config_dict)
+            if hasattr(config_dict['output_path'], '__str__'):
+                config_dict['output_path'] = str(config_dict['output_path'])
+
+        return (
+            job.id,
+            _dumps(job.urls),
+            _dumps(config_dict),
+            job.status,
+            job.created_at,
+            job.started_at,
+            job.completed_at,
+            job.error
+        )
+
+    _INSERT_RESULT_SQL = '''
+        INSERT INTO download_results
+        (job_id, success, url, title, duration, error, file_path,
+         content_type, metadata, timestamp, file_size, download_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
     def save_download_result(self, job_id: str, result: DownloadResult) -> None:
         """Save a download result to database"""
         with self._get_connection() as conn:
-            conn.execute('''
-                INSERT INTO download_results
-                (job_id, success, url, title, duration, error, file_path,
-                 content_type, metadata, timestamp, file_size, download_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                job_id,
-                result.success,
-                result.url,
-                result.title,
-                result.duration,
-                result.error,
-                str(result.file_path) if result.file_path else None,
-                result.content_type,
-                json.dumps(result.metadata) if result.metadata else None,
-                result.timestamp,
-                result.file_size,
-                result.download_time
-            ))
+            conn.execute(self._INSERT_RESULT_SQL, self._result_params(job_id, result))
+            conn.commit()
+
+    def save_download_results(self, job_id: str, results: List[DownloadResult]) -> None:
+        """Save all results of a job and update metrics in a single transaction"""
+        with self._get_connection() as conn:
+            # Rows inserted below get ids above this mark; MAX on the primary key is a single seek
+            last_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM download_results').fetchone()[0]
+            conn.executemany(
+                self._INSERT_RESULT_SQL,
+                [self._result_params(job_id, result) for result in results]
+            )
+            totals = conn.execute(self._BATCH_TOTALS_SQL, (job_id, last_id)).fetchone()
+            self._fold_metrics(conn, dict(totals))
             conn.commit()
 
+    @staticmethod
+    def _result_params(job_id: str, result: DownloadResult) -> tuple:
+        """Build the INSERT parameters for a download result"""
+        return (
+            job_id,
+            result.success,
+            result.url,
+            result.title,
+            result.duration,
+            result.error,
+            str(result.file_path) if result.file_path else None,
+            result.content_type,
+            _dumps(result.metadata) if result.metadata else None,
+            result.timestamp,
+            result.file_size,
+            result.download_time
+        )
+
     def get_download_job(self, job_id: str) -> Optional[DownloadJob]:
         """Retrieve a download job by ID"""
         with self._get_connection() as conn:
@@ -142,104 +270,191 @@ class DatabaseManager:
             ).fetchone()
 
             if row:
-                from .data_models import DownloadConfig
-                urls = json.loads(row['urls'])
-                config_dict = json.loads(row['config'])
-
-                # Convert string path back to Path object
-                if 'output_path' in config_dict:
-                    config_dict['output_path'] = Path(config_dict['output_path'])
-
-                config = DownloadConfig(**config_dict)
-
-                return DownloadJob(
-                    id=row['id'],
-                    urls=urls,
-                    config=config,
-                    status=row['status'],
-                    created_at=datetime.fromisoformat(row['created_at']),
-                    started_at=datetime.fromisoformat(row['started_at']) if row['started_at'] else None,
-                    completed_at=datetime.fromisoformat(row['completed_at']) if row['completed_at'] else None,
-                    error=row['error']
-                )
+                return self._row_to_job(row)
         return None
 
+    def get_download_job_with_results(self, job_id: str) -> Optional[DownloadJob]:
+        """Retrieve a download job and its results in a single query"""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                self._JOB_WITH_RESULTS_SQL.format(jobs='download_jobs')
+                + ' WHERE j.id = ? ORDER BY r.timestamp',
+                (job_id,)
+            ).fetchall()
+
+        jobs = self._group_job_rows(rows)
+        return jobs[0] if jobs else None
+
     def get_download_results(self, job_id: str) -> List[DownloadResult]:
         """Get all results for a download job"""
-        results = []
         with self._get_connection() as conn:
             rows = conn.execute(
                 'SELECT * FROM download_results WHERE job_id = ? ORDER BY timestamp',
                 (job_id,)
             ).fetchall()
 
-            for row in rows:
-                results.append(DownloadResult(
-                    success=bool(row['success']),
-                    url=row['url'],
-                    title=row['title'],
-                    duration=row['duration'],
-                    error=row['error'],
-                    file_path=Path(row['file_path']) if row['file_path'] else None,
-                    content_type=row['content_type'],
-                    metadata=json.loads(row['metadata']) if row['metadata'] else None,
-                    timestamp=datetime.fromisoformat(row['timestamp']),
-                    file_size=row['file_size'],
-                    download_time=row['download_time']
-                ))
-        return results
+            return [self._row_to_result(row) for row in rows]
 
-    def update_metrics(self, results: List[DownloadResult]) -> None:
-        """Update download metrics"""
-        successful = sum(1 for r in results if r.success)
-        failed = len(results) - successful
-        total_bytes = sum(r.file_size or 0 for r in results if r.success)
-        avg_time = sum(r.download_time or 0 for r in results if r.success) / max(successful, 1)
+    def list_download_jobs(self, status: Optional[str] = None, limit: int = 50,
+                           offset: int = 0) -> List[DownloadJob]:
+        """List download jobs with their results, newest first"""
+        page = 'SELECT * FROM download_jobs'
+        params: List[Any] = []
+
+        if status:
+            page += ' WHERE status = ?'
+            params.append(status)
+
+        page += ' ORDER BY created_at DESC LIMIT ? OFFSET ?'
+        params.extend([limit, offset])
 
         with self._get_connection() as conn:
-            # Get current metrics
-            current = conn.execute(
-                'SELECT * FROM download_metrics WHERE id = 1'
-            ).fetchone()
+            rows = conn.execute(
+                self._JOB_WITH_RESULTS_SQL.format(jobs=f'({page})')
+                + ' ORDER BY j.created_at DESC, r.timestamp',
+                params
+            ).fetchall()
 
-            new_total = current['total_downloads'] + len(results)
-            new_successful = current['successful_downloads'] + successful
-            new_failed = current['failed_downloads'] + failed
-            new_bytes = current['total_bytes_downloaded'] + total_bytes
+        return self._group_job_rows(rows)
 
-            # Calculate new averages
-            if new_successful > 0:
-                new_avg_time = ((current['average_download_time'] * current['successful_downloads']) +
-                               (avg_time * successful)) / new_successful
-                new_avg_speed = new_bytes / max(new_avg_time * new_successful, 1)
-            else:
-                new_avg_time = 0.0
-                new_avg_speed = 0.0
+    # Result columns are prefixed so they don't shadow the job's id/error
+    _RESULT_COLUMNS = ('id', 'success', 'url', 'title', 'duration', 'error', 'file_path',
+                       'content_type', 'metadata', 'timestamp', 'file_size', 'download_time')
+    _JOB_WITH_RESULTS_SQL = (
+        'SELECT j.*, ' + ', '.join(f'r.{col} AS r_{col}' for col in _RESULT_COLUMNS)
+        + ' FROM {jobs} j LEFT JOIN download_results r ON r.job_id = j.id'
+    )
 
-            conn.execute('''
-                UPDATE download_metrics SET
-                    total_downloads = ?,
-                    successful_downloads = ?,
-                    failed_downloads = ?,
-                    total_bytes_downloaded = ?,
-                    average_download_speed = ?,
-                    average_download_time = ?,
-                    last_updated = ?
-                WHERE id = 1
-            ''', (
-                new_total, new_successful, new_failed, new_bytes,
-                new_avg_speed, new_avg_time, datetime.now()
-            ))
+    def _group_job_rows(self, rows: List[sqlite3.Row]) -> List[DownloadJob]:
+        """Fold joined job/result rows into DownloadJobs in one pass, keeping row order"""
+        jobs: Dict[str, DownloadJob] = {}
+        for row in rows:
+            job = jobs.get(row['id'])
+            if job is None:
+                job = jobs[row['id']] = self._row_to_job(row)
+                job.results = []
+            if row['r_id'] is not None:
+                job.results.append(self._row_to_result(row, prefix='r_'))
+        return list(jobs.values())
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> DownloadJob:
+        """Build a DownloadJob from a download_jobs row"""
+        urls = orjson.loads(row['urls'])
+        config_dict = orjson.loads(row['config'])
+
+        # Convert string path back to Path object
+        if 'output_path' in config_dict:
+            config_dict['output_path'] = Path(config_dict['output_path'])
+
+        config = DownloadConfig(**config_dict)
+
+        return DownloadJob(
+            id=row['id'],
+            urls=urls,
+            config=config,
+            status=row['status'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            started_at=datetime.fromisoformat(row['started_at']) if row['started_at'] else None,
+            completed_at=datetime.fromisoformat(row['completed_at']) if row['completed_at'] else None,
+            error=row['error']
+        )
+
+    @staticmethod
+    def _row_to_result(row: sqlite3.Row, prefix: str = '') -> DownloadResult:
+        """Build a DownloadResult from a download_results row"""
+        metadata = row[prefix + 'metadata']
+        file_path = row[prefix + 'file_path']
+        return DownloadResult(
+            success=bool(row[prefix + 'success']),
+            url=row[prefix + 'url'],
+            title=row[prefix + 'title'],
+            duration=row[prefix + 'duration'],
+            error=row[prefix + 'error'],
+            file_path=Path(file_path) if file_path else None,
+            content_type=row[prefix + 'content_type'],
+            metadata=orjson.loads(metadata) if metadata else None,
+            timestamp=datetime.fromisoformat(row[prefix + 'timestamp']),
+            file_size=row[prefix + 'file_size'],
+            download_time=row[prefix + 'download_time']
+        )
+
+    def update_metrics(self, results: List[DownloadResult]) -> None:
+        """Update download metrics"""
+        with self._get_connection() as conn:
+            self._apply_metrics(conn, results)
             conn.commit()
 
+    # Folds a batch into the running totals in one statement; SET expressions see the old row
+    _APPLY_METRICS_SQL = '''
+        UPDATE download_metrics SET
+            total_downloads = total_downloads + :total,
+            successful_downloads = successful_downloads + :successful,
+            failed_downloads = failed_downloads + :failed,
+            total_bytes_downloaded = total_bytes_downloaded + :bytes,
+            average_download_time = CASE WHEN successful_downloads + :successful > 0
+                THEN (average_download_time * successful_downloads + :time)
+                     / (successful_downloads + :successful)
+                ELSE 0.0 END,
+            average_download_speed = CASE WHEN successful_downloads + :successful > 0
+                THEN CAST(total_bytes_downloaded + :bytes AS REAL)
+                     / MAX(average_download_time * successful_downloads + :time, 1)
+                ELSE 0.0 END,
+            last_updated = :now
+        WHERE id = 1
+    '''
+
+    # Aggregates a just-inserted batch in one scan of the job's rows
+    _BATCH_TOTALS_SQL = '''
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(success), 0) AS successful,
+            COALESCE(SUM(CASE WHEN success THEN file_size END), 0) AS bytes,
+            COALESCE(SUM(CASE WHEN success THEN download_time END), 0.0) AS time
+        FROM download_results
+        WHERE job_id = ? AND id > ?
+    '''
+
+    def _apply_metrics(self, conn: sqlite3.Connection, results: List[DownloadResult]) -> None:
+        """Fold a batch of results into the metrics row (caller commits)"""
+        successful = bytes_downloaded = download_time = 0
+        for result in results:
+            if result.success:
+                successful += 1
+                bytes_downloaded += result.file_size or 0
+                download_time += result.download_time or 0
+        self._fold_metrics(conn, {
+            'total': len(results),
+            'successful': successful,
+            'bytes': bytes_downloaded,
+            'time': download_time,
+        })
+
+    def _fold_metrics(self, conn: sqlite3.Connection, totals: Dict[str, Any]) -> None:
+        """Add batch totals (total, successful, bytes, time) to the metrics row"""
+        conn.execute(self._APPLY_METRICS_SQL, {
+            **totals,
+            'failed': totals['total'] - totals['successful'],
+            'now': datetime.now(),
+        })
+        # data_version doesn't move for a connection's own commits
+        self._local.metrics = None
+
     def get_metrics(self) -> DownloadMetrics:
         """Get current download metrics"""
         with self._get_connection() as conn:
+            # data_version changes whenever another connection (any thread or process) commits;
+            # this connection's own writes clear the cache in _fold_metrics instead
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+            cached = getattr(self._local, 'metrics', None)
+            if cached and cached[0] == data_version:
+                return cached[1]
+
             row = conn.execute(
                 'SELECT * FROM download_metrics WHERE id = 1'
             ).fetchone()
 
-            return DownloadMetrics(
+            metrics = DownloadMetrics(
                 total_downloads=row['total_downloads'],
                 successful_downloads=row['successful_downloads'],
                 failed_downloads=row['failed_downloads'],
@@ -248,14 +463,16 @@ class DatabaseManager:
                 average_download_time=row['average_download_time'],
                 last_updated=datetime.fromisoformat(row['last_updated'])
             )
+            self._local.metrics = (data_version, metrics)
+            return metrics
 
     def cleanup_old_jobs(self, days: int = 30) -> int:
         """Clean up jobs older than specified days"""
-        cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        cutoff_date = cutoff_date.replace(day=cutoff_date.day - days)
+        cutoff_date = datetime.now() - timedelta(days=days)
 
         with self._get_connection() as conn:
-            # Delete old results first (foreign key constraint)
+            # Delete old results first (foreign key constraint); the subquery is a range
+            # scan on idx_download_jobs_created_at, the outer delete uses idx_download_results_job_id
             conn.execute(
                 'DELETE FROM download_results WHERE job_id IN (SELECT id FROM download_jobs WHERE created_at < ?)',
                 (cutoff_date,)
@@ -269,4 +486,51 @@ class DatabaseManager:
 
             deleted_count = cursor.rowcount
             conn.commit()
-            return deleted_count
\ No newline at end of file
+            return deleted_count
+
+class AsyncDatabaseManager:
+    """Awaitable facade over DatabaseManager for use from the event loop
+
+    Each call runs the synchronous SQLite operation in a worker thread, so
+    request handlers never block the loop on database I/O.
+    """
+
+    def __init__(self, db: DatabaseManager) -> None:
+        self.db = db
+
+    async def save_download_job(self, job: DownloadJob) -> None:
+        """Save a download job to database"""
+        await asyncio.to_thread(self.db.save_download_job, job)
+
+    async def save_download_jobs(self, jobs: List[DownloadJob]) -> None:
+        """Save a batch of download jobs in a single transaction"""
+        await asyncio.to_thread(self.db.save_download_jobs, jobs)
+
+    async def save_download_results(self, job_id: str, results: List[DownloadResult]) -> None:
+        """Save all results of a job and update metrics in a single transaction"""
+        await asyncio.to_thread(self.db.save_download_results, job_id, results)
+
+    async def get_download_job(self, job_id: str) -> Optional[DownloadJob]:
+        """Retrieve a download job by ID"""
+        return await asyncio.to_thread(self.db.get_download_job, job_id)
+
+    async def get_download_job_with_results(self, job_id: str) -> Optional[DownloadJob]:
+        """Retrieve a download job and its results in a single query"""
+        return await asyncio.to_thread(self.db.get_download_job_with_results, job_id)
+
+    async def get_download_results(self, job_id: str) -> List[DownloadResult]:
+        """Get all results for a download job"""
+        return await asyncio.to_thread(self.db.get_download_results, job_id)
+
+    async def list_download_jobs(self, status: Optional[str] = None, limit: int = 50,
+                                 offset: int = 0) -> List[DownloadJob]:
+        """List download jobs with their results, newest first"""
+        return await asyncio.to_thread(self.db.list_download_jobs, status, limit, offset)
+
+    async def get_metrics(self) -> DownloadMetrics:
+        """Get current download metrics"""
+        return await asyncio.to_thread(self.db.get_metrics)
+
+    async def cleanup_old_jobs(self, days: int = 30) -> int:
+        """Clean up jobs older than specified days"""
+        return await asyncio.to_thread(self.db.cleanup_old_jobs, days)
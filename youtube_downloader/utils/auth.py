@@ -2,10 +2,10 @@
 
 import os
 import tempfile
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import subprocess
-import json
+import orjson
 
 from utils.logger import setup_logger
 
@@ -94,19 +94,41 @@ class YouTubeAuthenticator:
             logger.warning(f"Cookie validation failed: {e}")
             return False
 
+    def first_valid_cookie_file(self, candidates: List[Tuple[str, str]]) -> Optional[str]:
+        """Validate (cookie_file, message) candidates concurrently; return the first that works
+
+        Each validation is a network round-trip, so they all run at once and the
+        earliest-listed valid candidate wins as soon as it and everything before it settle.
+        """
+        # The same file can be reached by two routes (e.g. a converted JSON export)
+        unique: Dict[str, str] = {}
+        for cookie_file, message in candidates:
+            unique.setdefault(cookie_file, message)
+        if not unique:
+            return None
+        candidates = list(unique.items())
+
+        executor = ThreadPoolExecutor(max_workers=min(len(candidates), 4))
+        try:
+            futures = [executor.submit(self.validate_cookies, cookie_file) for cookie_file, _ in candidates]
+            for (cookie_file, message), future in zip(candidates, futures):
+                if future.result():
+                    logger.info(message)
+                    return cookie_file
+            return None
+        finally:
+            # Don't wait on lower-priority validations once the answer is known
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def convert_json_cookies_to_netscape(self, json_file: str) -> Optional[str]:
         """Convert Chrome JSON cookie export to Netscape format"""
         try:
-            import json
-            from pathlib import Path
-
             json_path = Path(json_file)
             if not json_path.exists():
                 logger.error(f"JSON cookie file not found: {json_file}")
                 return None
 
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = orjson.loads(json_path.read_bytes())
 
             cookies = data.get('cookies', [])
             if not cookies:
@@ -116,27 +138,27 @@ class YouTubeAuthenticator:
             # Create Netscape format cookie file
             netscape_file = json_path.parent / 'cookies_netscape.txt'
 
-            with open(netscape_file, 'w', encoding='utf-8') as f:
-                # Write Netscape header
-                f.write("# Netscape HTTP Cookie File\n")
-                f.write("# This file was generated from Chrome JSON export\n")
-                f.write("# https://curl.se/docs/http-cookies.html\n")
-                f.write("# This file can be used by wget, curl, yt-dlp, etc.\n\n")
-
-                for cookie in cookies:
-                    # Convert to Netscape format:
-                    # domain, flag, path, secure, expiration, name, value
-                    domain = cookie.get('domain', '')
-                    flag = 'TRUE' if not cookie.get('hostOnly', False) else 'FALSE'
-                    path = cookie.get('path', '/')
-                    secure = 'TRUE' if cookie.get('secure', False) else 'FALSE'
-                    expiration = str(int(cookie.get('expirationDate', 0)))
-                    name = cookie.get('name', '')
-                    value = cookie.get('value', '')
-
-                    if name and value:  # Only write valid cookies
-                        line = f"{domain}\t{flag}\t{path}\t{secure}\t{expiration}\t{name}\t{value}\n"
-                        f.write(line)
+            # Netscape header, then one line per cookie:
+            # domain, flag, path, secure, expiration, name, value
+            lines = [
+                "# Netscape HTTP Cookie File\n",
+                "# This file was generated from Chrome JSON export\n",
+                "# https://curl.se/docs/http-cookies.html\n",
+                "# This file can be used by wget, curl, yt-dlp, etc.\n\n",
+            ]
+            lines.extend(
+                f"{cookie.get('domain', '')}\t"
+                f"{'FALSE' if cookie.get('hostOnly', False) else 'TRUE'}\t"
+                f"{cookie.get('path', '/')}\t"
+                f"{'TRUE' if cookie.get('secure', False) else 'FALSE'}\t"
+                f"{int(cookie.get('expirationDate', 0))}\t"
+                f"{cookie['name']}\t{cookie['value']}\n"
+                for cookie in cookies
+                if cookie.get('name') and cookie.get('value')  # Only write valid cookies
+            )
+
+            # Assemble in memory and hand the file one write
+            netscape_file.write_text(''.join(lines), encoding='utf-8')
 
             logger.info(f"Converted {len(cookies)} cookies to Netscape format: {netscape_file}")
             return str(netscape_file)
@@ -241,42 +263,47 @@ def setup_youtube_auth(config) -> Optional[str]:
 
     try:
         browser = config.get('browser_cookies', 'chrome')
-
-        # First try automatic extraction
-        cookie_file = auth.extract_cookies(browser)
-
-        if cookie_file and auth.validate_cookies(cookie_file):
-            logger.info(f"YouTube authentication successful using {browser} cookies")
-            return cookie_file
-
-        # If automatic extraction fails, check for manual cookie file
-        manual_cookie_file = config.get('cookies_file')
-        if manual_cookie_file and Path(manual_cookie_file).exists():
-            if auth.validate_cookies(manual_cookie_file):
-                logger.info("Using manually provided cookie file")
-                return manual_cookie_file
-
-        # Check for JSON cookie export and convert it
         project_root = Path(__file__).parent.parent
-        json_cookie_file = project_root / 'www.youtube.com.json'
-        if json_cookie_file.exists():
-            logger.info("Found Chrome JSON cookie export, converting to Netscape format...")
-            netscape_file = auth.convert_json_cookies_to_netscape(str(json_cookie_file))
-            if netscape_file and auth.validate_cookies(netscape_file):
-                logger.info("Successfully converted and validated JSON cookies")
-                return netscape_file
-
-        # Check for cookies.txt in project root
-        fallback_cookie_file = project_root / 'cookies.txt'
-        if fallback_cookie_file.exists() and auth.validate_cookies(str(fallback_cookie_file)):
-            logger.info("Using cookies.txt from project root")
-            return str(fallback_cookie_file)
-
-        # Check for converted Netscape file
-        netscape_cookie_file = project_root / 'cookies_netscape.txt'
-        if netscape_cookie_file.exists() and auth.validate_cookies(str(netscape_cookie_file)):
-            logger.info("Using converted Netscape cookie file")
-            return str(netscape_cookie_file)
+
+        def browser_candidates() -> List[Tuple[str, str]]:
+            # First try automatic extraction
+            cookie_file = auth.extract_cookies(browser)
+            if cookie_file:
+                return [(cookie_file, f"YouTube authentication successful using {browser} cookies")]
+            return []
+
+        def manual_candidates() -> List[Tuple[str, str]]:
+            # Then a manually provided cookie file
+            manual_cookie_file = config.get('cookies_file')
+            if manual_cookie_file and Path(manual_cookie_file).exists():
+                return [(manual_cookie_file, "Using manually provided cookie file")]
+            return []
+
+        def project_root_candidates() -> List[Tuple[str, str]]:
+            candidates = []
+            # Check for JSON cookie export and convert it
+            json_cookie_file = project_root / 'www.youtube.com.json'
+            if json_cookie_file.exists():
+                logger.info("Found Chrome JSON cookie export, converting to Netscape format...")
+                netscape_file = auth.convert_json_cookies_to_netscape(str(json_cookie_file))
+                if netscape_file:
+                    candidates.append((netscape_file, "Successfully converted and validated JSON cookies"))
+
+            # Check for cookies.txt and a previously converted Netscape file in project root
+            for name, message in (('cookies.txt', "Using cookies.txt from project root"),
+                                  ('cookies_netscape.txt', "Using converted Netscape cookie file")):
+                fallback_cookie_file = project_root / name
+                if fallback_cookie_file.exists():
+                    candidates.append((str(fallback_cookie_file), message))
+            return candidates
+
+        # Tiers are gathered lazily and tried in order, so valid browser cookies cost one
+        # validation and the JSON export is only converted when nothing ahead of it works;
+        # only the project-root fallbacks of the last tier are validated concurrently
+        for tier in (browser_candidates, manual_candidates, project_root_candidates):
+            cookie_file = auth.first_valid_cookie_file(tier())
+            if cookie_file:
+                return cookie_file
 
         # If all methods fail, provide guidance
         logger.warning("YouTube authentication failed - proceeding without cookies")
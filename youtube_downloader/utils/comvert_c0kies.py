@@ -1,17 +1,33 @@
+import os
+from functools import partial
 from utils.auth import YouTubeAuthenticator
-auth = YouTubeAuthenticator()
-cookies=input('Enter the path to your browser cookies JSON file (e.g., www.youtube.com.json): ').strip()
-result = auth.convert_json_cookies_to_netscape(cookies)
-print(f'Conversion result: {result}')
-if result:
-    import os
-    print(f'File exists: {os.path.exists(result)}')
-    if os.path.exists(result):
-        with open(result, 'r') as f:
-            content = f.read()
-            lines = content.split('\n')
-            print(f'Lines in file: {len(lines)}')
+
+def main():
+    """Convert a browser JSON cookie export and preview the result"""
+    auth = YouTubeAuthenticator()
+    cookies=input('Enter the path to your browser cookies JSON file (e.g., www.youtube.com.json): ').strip()
+    result = auth.convert_json_cookies_to_netscape(cookies)
+    print(f'Conversion result: {result}')
+    if result:
+        print(f'File exists: {os.path.exists(result)}')
+        if os.path.exists(result):
+            with open(result, 'rb') as f:
+                # Count newlines with bytes.count (a C-level scan) over 1 MiB binary chunks;
+                # a final line without a trailing newline still counts
+                line_count = 0
+                head = chunk = b''
+                for chunk in iter(partial(f.read, 1 << 20), b''):
+                    head = head or chunk
+                    line_count += chunk.count(b'\n')
+                line_count += bool(chunk) and not chunk.endswith(b'\n')
+            print(f'Lines in file: {line_count}')
+            # The preview comes from the first 8 KiB of the first chunk, however long the lines
+            preview = head[:8192].decode('utf-8', errors='replace').splitlines()[:10]
             print('First few lines:')
-            for i, line in enumerate(lines[:10]):
-                if line.strip():
-                    print(f'{i+1}: {line.strip()[:100]}...')
+            for i, line in enumerate(preview):
+                stripped = line.strip()
+                if stripped:
+                    print(f'{i+1}: {stripped[:100]}...')
+
+if __name__ == '__main__':
+    main()
@@ -1,82 +1,69 @@
-import re
+import sys
 from typing import List, Dict
-from urllib.parse import urlparse
 
-def parse_multiple_urls(url_input: str) -> List[str]:
-    """Parse multiple URLs from input string"""
-    urls = []
-    lines = url_input.strip().split('\n')
+# "00".."99", so sub-hour durations are formatted by indexing rather than __format__
+_TWO_DIGITS = tuple(f"{n:02d}" for n in range(100))
 
-    for line in lines:
-        line = line.strip()
-        if line:
-            # Split by common separators
-            parts = re.split(r'[,\s]+', line)
-            for part in parts:
-                part = part.strip()
-                if part and is_valid_url(part):
-                    urls.append(part)
-
-    return urls
-
-def is_valid_url(url: str) -> bool:
-    """Basic URL validation"""
-    try:
-        result = urlparse(url)
-        return all([result.scheme, result.netloc])
-    except:
-        return False
-
-def print_download_summary(results: List[Dict], output_path: str):
-    """Print a summary of download results"""
-    if not results:
+def print_download_totals(successful_count: int, failed: List[Dict], output_path: str):
+    """Print a summary of a streamed download session from its tallies"""
+    if not successful_count and not failed:
         print("❌ No downloads to summarize.")
         return
 
-    successful = [r for r in results if r.get('success', False)]
-    failed = [r for r in results if not r.get('success', False)]
+    # Assemble the whole report and write it once; a print per line costs a write per line
+    lines = [
+        "",
+        "=" * 60,
+        "📊 DOWNLOAD SUMMARY",
+        "=" * 60,
+        f"Total URLs processed: {successful_count + len(failed)}",
+        f"✅ Successful downloads: {successful_count}",
+        f"❌ Failed downloads: {len(failed)}",
+        f"📁 Output directory: {output_path}",
+        "",
+    ]
+
+    # Successful items were already printed as they finished
+    if failed:
+        lines.append("❌ FAILED DOWNLOADS:")
+        # Each failure is two lines: the URL, then its error
+        lines.extend([
+            f"  🔗 {result.get('url', '')}\n     Error: {result.get('error', 'Unknown error')}"
+            for result in failed
+        ])
+        lines.append("")
 
-    print("\n" + "=" * 60)
-    print("📊 DOWNLOAD SUMMARY")
-    print("=" * 60)
-    print(f"Total URLs processed: {len(results)}")
-    print(f"✅ Successful downloads: {len(successful)}")
-    print(f"❌ Failed downloads: {len(failed)}")
-    print(f"📁 Output directory: {output_path}")
-    print()
+    lines.append("🎉 Download session completed!")
+    sys.stdout.write("\n".join(lines) + "\n")
 
-    if successful:
-        print("✅ SUCCESSFUL DOWNLOADS:")
-        for result in successful:
-            title = result.get('title', 'Unknown')
-            url = result.get('url', '')
-            if result.get('type') == 'playlist':
-                entry_count = result.get('entry_count', 0)
-                downloaded = result.get('downloaded_entries', 0)
-                print(f"  📂 {title} ({downloaded}/{entry_count} videos)")
-            else:
-                duration = result.get('duration', 0)
-                duration_str = format_duration(duration) if duration else "Unknown"
-                print(f"  🎬 {title} ({duration_str})")
-        print()
+def print_download_result(result: Dict):
+    """Print the outcome of a single download as soon as it finishes"""
+    if result.get('success', False):
+        print(f"✅ {_describe_download(result)}")
+    else:
+        print(f"❌ {result.get('url', '')}: {result.get('error', 'Unknown error')}")
 
-    if failed:
-        print("❌ FAILED DOWNLOADS:")
-        for result in failed:
-            url = result.get('url', '')
-            error = result.get('error', 'Unknown error')
-            print(f"  🔗 {url}")
-            print(f"     Error: {error}")
-        print()
+def _describe_download(result: Dict) -> str:
+    """One-line description of a successful download"""
+    get = result.get
+    title = get('title', 'Unknown')
+    if get('type') == 'playlist':
+        entry_count = get('entry_count', 0)
+        downloaded = get('downloaded_entries', 0)
+        return f"📂 {title} ({downloaded}/{entry_count} videos)"
 
-    print("🎉 Download session completed!")
+    duration = get('duration', 0)
+    duration_str = format_duration(duration) if duration else "Unknown"
+    return f"🎬 {title} ({duration_str})"
 
 def format_duration(seconds: int) -> str:
     """Format duration in seconds to HH:MM:SS"""
-    hours, remainder = divmod(seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
+    # Plain // and % instead of divmod: no tuple to build and unpack
+    hours = seconds // 3600
+    minutes = seconds // 60 % 60
+    seconds = seconds % 60
 
-    if hours > 0:
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-    else:
-        return f"{minutes:02d}:{seconds:02d}"
\ No newline at end of file
+    # Most videos run under an hour, which only needs the MM:SS lookup
+    if not hours:
+        return _TWO_DIGITS[minutes] + ":" + _TWO_DIGITS[seconds]
+    return f"{hours:02d}:{_TWO_DIGITS[minutes]}:{_TWO_DIGITS[seconds]}"
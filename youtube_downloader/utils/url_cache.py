@@ -0,0 +1,102 @@
+"""Persistent cache of probed URL classifications"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse, parse_qs, urlencode
+
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_TTL = 7 * 24 * 3600  # 7 days
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a YouTube URL so equivalent forms share one cache key
+
+    youtu.be links become watch URLs, the host loses www./m., and only the
+    v and list parameters are kept (tracking parameters like si= are dropped).
+    """
+    parsed = urlparse(url if '://' in url else f'https://{url}')
+    host = parsed.netloc.lower()
+    for prefix in ('www.', 'm.'):
+        host = host.removeprefix(prefix)
+    query = parse_qs(parsed.query)
+
+    if host == 'youtu.be':
+        params = {'v': parsed.path.strip('/').split('/')[0]}
+        if 'list' in query:
+            params['list'] = query['list'][0]
+        return f'https://www.youtube.com/watch?{urlencode(params)}'
+
+    if host == 'youtube.com':
+        params = {key: query[key][0] for key in ('v', 'list') if key in query}
+        path = parsed.path.rstrip('/') or '/'
+        return f'https://www.youtube.com{path}' + (f'?{urlencode(params)}' if params else '')
+
+    return url
+
+class UrlCache:
+    """SQLite-backed map of canonical URL to content type, shared across runs"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl: int = DEFAULT_TTL) -> None:
+        self.db_path = db_path or os.getenv(
+            'YTD_URL_CACHE', os.path.join(tempfile.gettempdir(), 'ytd_url_cache.db')
+        )
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._disabled = False
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the cache database on first use; disable the cache if that fails"""
+        if self._conn is None and not self._disabled:
+            try:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS url_cache (
+                        url TEXT PRIMARY KEY,
+                        content_type TEXT NOT NULL,
+                        probed_at INTEGER NOT NULL
+                    )
+                ''')
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning(f"URL cache unavailable at {self.db_path}: {e}")
+                self._disabled = True
+        return self._conn
+
+    def get(self, url: str) -> Optional[str]:
+        """Get the cached content type of a URL, if probed within the TTL"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    'SELECT content_type FROM url_cache WHERE url = ? AND probed_at > ?',
+                    (canonicalize_url(url), int(time.time()) - self.ttl)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"URL cache read failed: {e}")
+                return None
+        return row[0] if row else None
+
+    def set(self, url: str, content_type: str) -> None:
+        """Remember the probed content type of a URL"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO url_cache (url, content_type, probed_at) VALUES (?, ?, ?)',
+                        (canonicalize_url(url), content_type, int(time.time()))
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"URL cache write failed: {e}")